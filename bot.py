@@ -1,39 +1,74 @@
+import time
+_process_start = time.perf_counter()
+
 import discord
-from discord.ext import commands
+import asyncio
+import logging
 import os
+from startup import BootTimer
+from log_pipeline import configure_logging
+from supervisor import SupervisedBot
+
+logger = logging.getLogger("leetcode_bot")
+LOG_FILE = "duel_bot_log.log"   # separate from main.py's: rotation is per process
+
+boot = BootTimer("bot", started_at=_process_start)
+boot.record("imports", time.perf_counter() - _process_start)
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = SupervisedBot(command_prefix="!", intents=intents, task_limits={"duels": 25, "tournaments": 3, "pollers": 4})
+
+def cog_names():
+    return [
+        filename[:-3]
+        for filename in sorted(os.listdir("./cogs"))
+        if filename.endswith(".py") and filename != "__init__.py"
+    ]
 
 @bot.event
 async def on_ready():
     await bot.change_presence(activity=discord.Game("LeetCode Duels"))
-    print(f"Logged in as {bot.user}!")
+    logger.info("Logged in as %s", bot.user)
+    if not boot.reported:
+        boot.record("gateway", time.perf_counter() - bot.setup_done_at)
+        logger.info(boot.report())
 
 @bot.command()
 async def reload(ctx):
     """Reload all cogs."""
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py") and filename != "__init__.py":
-            try:
-                await bot.reload_extension(f"cogs.{filename[:-3]}")
-            except Exception as e:
-                await ctx.send(f"❌ Failed to reload {filename[:-3]}: {e}")
-                print(f"Failed to reload {filename[:-3]}: {e}")
-                return
+    for name in cog_names():
+        try:
+            await bot.reload_extension(f"cogs.{name}")
+        except Exception as e:
+            await ctx.send(f"❌ Failed to reload {name}: {e}")
+            logger.error("Failed to reload %s: %s", name, e, extra={"operation": "reload_cog", "cog": name})
+            return
     await ctx.send("✅ All cogs reloaded successfully.")
 
-async def load_cogs():
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py") and filename != "__init__.py":
-            print(f"Loading cog: {filename[:-3]}")
-            await bot.load_extension(f"cogs.{filename[:-3]}")
+async def load_cog(name):
+    start = time.perf_counter()
+    await bot.load_extension(f"cogs.{name}")
+    boot.record(f"cog:{name}", time.perf_counter() - start)
+
+@bot.event
+async def setup_hook():
+    """Load every cog concurrently; one broken cog doesn't block the rest."""
+    names = cog_names()
+    with boot.phase("cogs"):
+        results = await asyncio.gather(*(load_cog(name) for name in names), return_exceptions=True)
+    failed = [name for name, result in zip(names, results) if isinstance(result, Exception)]
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error("Failed to load cog %s: %s", name, result, extra={"operation": "load_cog", "cog": name})
+    if failed:
+        logger.warning("Loaded %d/%d cogs; failed: %s", len(names) - len(failed), len(names), ", ".join(failed))
+    else:
+        logger.info("Loaded %d/%d cogs.", len(names), len(names))
+    bot.setup_done_at = time.perf_counter()
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(load_cogs())
-    print("Cogs loaded successfully.")
+    configure_logging(LOG_FILE)
     bot.run(os.getenv("DISCORD_BOT_TOKEN"))
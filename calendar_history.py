@@ -0,0 +1,195 @@
+# calendar_history.py
+
+import sqlite3
+import time
+from array import array
+from datetime import date, datetime, timedelta, timezone
+import aiohttp
+import jsoncodec
+from graphql_queries import CALENDAR_QUERY
+from leetcode_api import graphql, STATS_TTL
+from submission_history import HISTORY_DB
+
+DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calendar_years (
+    username   TEXT    NOT NULL,
+    year       INTEGER NOT NULL,
+    days       BLOB    NOT NULL,
+    through    INTEGER NOT NULL,
+    complete   INTEGER NOT NULL,
+    fetched_at REAL    NOT NULL,
+    PRIMARY KEY (username, year)
+);
+"""
+
+
+def day_index(ts: int) -> tuple[int, int]:
+    """(year, day of year starting at 0) for a UTC timestamp."""
+    d = datetime.fromtimestamp(ts, tz=timezone.utc).date()
+    return d.year, (d - date(d.year, 1, 1)).days
+
+def day_timestamp(year: int, idx: int) -> int:
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()) + idx * DAY
+
+def days_in_year(year: int) -> int:
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days
+
+def parse_calendar(raw: str | None) -> dict[int, int]:
+    try:
+        return {int(ts): n for ts, n in jsoncodec.loads(raw or "{}").items()}
+    except ValueError:
+        return {}
+
+
+class CalendarHistory:
+    """
+    Per-user submission calendars across every year the user was active, in
+    history.db.
+
+    Each (user, year) is one row holding an array('H') of per-day submission
+    counts. A past year is fetched once after it has ended and is never
+    touched again; the current year only merges days from its last stored day
+    onwards, so a refresh writes a short tail instead of rewriting the year.
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self._frozen: dict[tuple[str, int], array] = {}   # complete years never change
+
+    def _row(self, user: str, year: int):
+        return self.db.execute(
+            "SELECT days, through, complete FROM calendar_years WHERE username = ? AND year = ?", (user, year)
+        ).fetchone()
+
+    def year_days(self, username: str, year: int) -> array | None:
+        user = username.lower()
+        days = self._frozen.get((user, year))
+        if days is not None:
+            return days
+        row = self._row(user, year)
+        if row is None:
+            return None
+        days = array("H")
+        days.frombytes(row[0])
+        if row[2]:
+            self._frozen[(user, year)] = days
+        return days
+
+    def years(self, username: str) -> list[int]:
+        rows = self.db.execute("SELECT year FROM calendar_years WHERE username = ? ORDER BY year", (username.lower(),))
+        return [year for (year,) in rows]
+
+    def is_complete(self, username: str, year: int) -> bool:
+        row = self._row(username.lower(), year)
+        return bool(row and row[2])
+
+    def merge(self, username: str, year: int, calendar: dict[int, int], complete: bool = False):
+        """Fold one year's calendar in, touching only days at or after the stored tail."""
+        user = username.lower()
+        row = self._row(user, year)
+        days = array("H", bytes(2 * days_in_year(year)))
+        through = -1
+        if row is not None:
+            days = array("H")
+            days.frombytes(row[0])
+            through = row[1]
+        for ts, count in calendar.items():
+            y, idx = day_index(ts)
+            # The last stored day may still have grown; anything earlier is settled.
+            if y == year and (idx >= through or complete):
+                days[idx] = min(count, 0xFFFF)
+                through = max(through, idx)
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute(
+                "INSERT OR REPLACE INTO calendar_years VALUES (?, ?, ?, ?, ?, ?)",
+                (user, year, days.tobytes(), through, int(complete), time.time()),
+            )
+        if complete:
+            self._frozen[(user, year)] = days
+
+    async def _fetch(self, session: aiohttp.ClientSession, username: str, year: int) -> dict | None:
+        data = await graphql(session, CALENDAR_QUERY, {"username": username, "year": year}, ttl=STATS_TTL)
+        return ((data.get("data") or {}).get("matchedUser") or {}).get("userCalendar")
+
+    async def refresh(self, session: aiohttp.ClientSession, username: str) -> dict | None:
+        """
+        Refresh the current year and backfill any past year not yet stored
+        in full. Returns LeetCode's userCalendar block for the current year
+        (for its live streak), or None for an unknown user.
+        """
+        year = datetime.now(timezone.utc).year
+        current = await self._fetch(session, username, year)
+        if current is None:
+            return None
+        self.merge(username, year, parse_calendar(current.get("submissionCalendar")))
+        for past in current.get("activeYears") or []:
+            if past < year and not self.is_complete(username, past):
+                block = await self._fetch(session, username, past)
+                if block is not None:
+                    self.merge(username, past, parse_calendar(block.get("submissionCalendar")), complete=True)
+        return current
+
+    # ------------------------- Views -------------------------
+    def recent(self, username: str, days: int = 30) -> dict[int, int]:
+        """{midnight UTC timestamp: submissions} for the last `days` days, across year boundaries."""
+        today = datetime.now(timezone.utc).date()
+        result = {}
+        for back in range(days):
+            d = today - timedelta(days=back)
+            counts = self.year_days(username, d.year)
+            idx = (d - date(d.year, 1, 1)).days
+            if counts is not None and counts[idx]:
+                result[day_timestamp(d.year, idx)] = counts[idx]
+        return result
+
+    def last_active_day(self, username: str) -> int | None:
+        for year in reversed(self.years(username)):
+            counts = self.year_days(username, year)
+            for idx in range(len(counts) - 1, -1, -1):
+                if counts[idx]:
+                    return day_timestamp(year, idx)
+        return None
+
+    def year_totals(self, username: str, through_day: int | None = None) -> dict[int, int]:
+        """Submissions per year; with `through_day`, only days 0..through_day of each year."""
+        totals = {}
+        for year in self.years(username):
+            counts = self.year_days(username, year)
+            totals[year] = sum(counts if through_day is None else counts[:through_day + 1])
+        return totals
+
+    def lifetime(self, username: str) -> tuple[int, int]:
+        """(total submissions, active days) over every stored year."""
+        total = active = 0
+        for year in self.years(username):
+            counts = self.year_days(username, year)
+            total += sum(counts)
+            active += len(counts) - counts.count(0)
+        return total, active
+
+    def longest_streak(self, username: str) -> int:
+        """Longest run of consecutive active days ever, carried across New Year."""
+        best = run = 0
+        prev_year = None
+        for year in self.years(username):
+            if prev_year is not None and year != prev_year + 1:
+                run = 0   # a whole inactive year in between
+            for count in self.year_days(username, year):
+                run = run + 1 if count else 0
+                best = max(best, run)
+            prev_year = year
+        return best
+
+
+_calendars = None
+
+def get_calendar_history() -> CalendarHistory:
+    global _calendars
+    if _calendars is None:
+        _calendars = CalendarHistory()
+    return _calendars
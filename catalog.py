@@ -0,0 +1,119 @@
+# catalog.py
+
+import asyncio
+import logging
+import time
+import aiohttp
+import jsoncodec
+from graphql_queries import CATALOG_PAGE_QUERY
+from leetcode_api import graphql, get_session, CATALOG_TTL
+
+logger = logging.getLogger("leetcode_bot")
+
+CATALOG_FILE = "problems.json"
+CATALOG_MAX_AGE = 24 * 60 * 60  # refresh the local copy once a day
+PAGE_SIZE = 500
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+class ProblemCatalog:
+    """
+    Local copy of the LeetCode problem list, ordered by frontend problem ID.
+
+    Each problem's position in `problems` is its bit in every bitset built on
+    top of the catalog (see solved_index.py), so masks for difficulty pools
+    are plain ints and set operations on them are single big-int ops.
+    """
+
+    def __init__(self, path: str = CATALOG_FILE):
+        self.path = path
+        self.problems: list[dict] = []
+        self.index: dict[str, int] = {}        # slug → bit position
+        self.fetched_at = 0.0
+        self.version = 0                       # bumped whenever problems change
+        self._masks: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self.problems)
+
+    def _set_problems(self, problems: list[dict], fetched_at: float):
+        problems.sort(key=lambda q: int(q["frontendQuestionId"]) if str(q["frontendQuestionId"]).isdigit() else 10**9)
+        self.problems = problems
+        self.index = {q["titleSlug"]: i for i, q in enumerate(problems)}
+        self.fetched_at = fetched_at
+        self.version += 1
+        self._masks.clear()
+
+    def load(self) -> bool:
+        """Load the on-disk copy, if any. Returns True when something was loaded."""
+        data = jsoncodec.load_file(self.path)
+        if data is None:
+            return False
+        self._set_problems(data.get("problems", []), data.get("fetched_at", 0.0))
+        return bool(self.problems)
+
+    def save(self):
+        jsoncodec.dump_file(self.path, {"fetched_at": self.fetched_at, "problems": self.problems})
+
+    def is_stale(self) -> bool:
+        return not self.problems or time.time() - self.fetched_at > CATALOG_MAX_AGE
+
+    async def refresh(self, session: aiohttp.ClientSession):
+        """Page through the full question list and replace the local copy."""
+        problems, skip, total = [], 0, None
+        while total is None or skip < total:
+            variables = {"categorySlug": "", "skip": skip, "limit": PAGE_SIZE, "filters": {}}
+            data = await graphql(session, CATALOG_PAGE_QUERY, variables, ttl=CATALOG_TTL)
+            page = data["data"]["problemsetQuestionList"]
+            total = page["total"]
+            if not page["questions"]:
+                break
+            problems.extend(page["questions"])
+            skip += PAGE_SIZE
+        self._set_problems(problems, time.time())
+        await asyncio.to_thread(self.save)
+
+    async def ensure_loaded(self, session: aiohttp.ClientSession | None = None):
+        """Load from disk, falling back to (or refreshing from) LeetCode when stale."""
+        async with self._lock:
+            if not self.problems:
+                await asyncio.to_thread(self.load)
+            if self.is_stale():
+                try:
+                    await self.refresh(session or get_session())
+                except Exception as e:
+                    # A stale catalog is still far better than none.
+                    logger.error("Catalog refresh failed: %s", e, extra={"operation": "catalog_refresh"})
+
+    def get(self, slug: str) -> dict | None:
+        i = self.index.get(slug)
+        return self.problems[i] if i is not None else None
+
+    def mask_for(self, slugs) -> int:
+        mask = 0
+        for slug in slugs:
+            i = self.index.get(slug)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def pool_mask(self, difficulty: str | None = None) -> int:
+        """Bitset of free (non-premium) problems, optionally of one difficulty."""
+        key = (difficulty or "ANY").capitalize()
+        if key not in self._masks:
+            bits = "".join(
+                "1" if not q.get("isPaidOnly") and key in ("Any", q["difficulty"]) else "0"
+                for q in reversed(self.problems)
+            )
+            self._masks[key] = int(bits or "0", 2)
+        return self._masks[key]
+
+
+_catalog = None
+
+def get_catalog() -> ProblemCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = ProblemCatalog()
+    return _catalog
@@ -0,0 +1,172 @@
+# clock.py
+
+import asyncio
+import contextvars
+import datetime as dt
+import functools
+import heapq
+import itertools
+import logging
+import time as _time
+
+logger = logging.getLogger("leetcode_bot")
+
+
+class Clock:
+    """Wall-clock time and sleeping; what the bots run on in production."""
+
+    def time(self) -> float:
+        return _time.time()
+
+    def monotonic(self) -> float:
+        return _time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Simulated time for replaying the bots' schedules in seconds.
+
+    Nothing advances by itself: `sleep` parks the caller on a heap of
+    wake-ups, and `run_until` lets every runnable task settle, then jumps
+    straight to the earliest wake-up. A 30-minute duel or a day of 5-minute
+    status passes costs only the work done, not the waiting.
+
+    Work handed to threads only counts as settled if it goes through
+    `to_thread`, which the simulator installs in place of asyncio's.
+    """
+
+    SETTLE_PASSES = 20   # event-loop passes that let woken tasks run before the next jump
+
+    def __init__(self, start: float):
+        self.now = start
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._threads: set[asyncio.Future] = set()
+        self.jumps = 0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + seconds, next(self._seq), fut))
+        await fut
+
+    async def to_thread(self, func, /, *args, **kwargs):
+        """asyncio.to_thread, but tracked so `run_until` waits for it before jumping."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        fut = loop.run_in_executor(None, call)
+        self._threads.add(fut)
+        fut.add_done_callback(self._threads.discard)
+        return await fut
+
+    async def _settle(self):
+        """Let woken tasks run, and wait out any thread work they start, until both are quiet."""
+        while True:
+            for _ in range(self.SETTLE_PASSES):
+                await asyncio.sleep(0)
+            if not self._threads:
+                return
+            await asyncio.wait(set(self._threads))
+
+    def _next_due(self, deadline: float) -> bool:
+        while self._sleepers and self._sleepers[0][2].done():
+            heapq.heappop(self._sleepers)   # cancelled sleeps
+        return bool(self._sleepers) and self._sleepers[0][0] <= deadline
+
+    async def run_until(self, deadline: float):
+        """Drive every sleeper due before `deadline`, then park the clock there."""
+        while True:
+            await self._settle()
+            if not self._next_due(deadline):
+                break
+            when = self._sleepers[0][0]
+            self.now = max(self.now, when)
+            self.jumps += 1
+            while self._sleepers and self._sleepers[0][0] <= self.now:
+                fut = heapq.heappop(self._sleepers)[2]
+                if not fut.done():
+                    fut.set_result(None)
+        self.now = max(self.now, deadline)
+
+
+_clock: Clock = Clock()
+
+def install(clock: Clock):
+    """Swap the process-wide clock (the simulator installs a VirtualClock)."""
+    global _clock
+    _clock = clock
+
+def get_clock() -> Clock:
+    return _clock
+
+
+# Module-level shortcuts, so call sites read like the time/asyncio calls they replace.
+def time() -> float:
+    return _clock.time()
+
+def monotonic() -> float:
+    return _clock.monotonic()
+
+def now(tz: dt.tzinfo = dt.timezone.utc) -> dt.datetime:
+    return dt.datetime.fromtimestamp(_clock.time(), tz)
+
+async def sleep(seconds: float):
+    await _clock.sleep(seconds)
+
+async def sleep_until(when: dt.datetime):
+    await _clock.sleep((when - now(when.tzinfo)).total_seconds())
+
+async def wait_event(event: asyncio.Event, timeout: float) -> bool:
+    """asyncio.wait_for(event.wait(), timeout) on the installed clock; True if the event fired."""
+    waiter = asyncio.ensure_future(event.wait())
+    timer = asyncio.ensure_future(_clock.sleep(timeout))
+    try:
+        await asyncio.wait({waiter, timer}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiter.cancel()
+        timer.cancel()
+    return event.is_set()
+
+
+# ------------------------- Scheduling -------------------------
+def next_run(at: dt.time, after: dt.datetime) -> dt.datetime:
+    """The next datetime at wall time `at` (tz-aware) strictly after `after`."""
+    local = after.astimezone(at.tzinfo)
+    candidate = local.replace(hour=at.hour, minute=at.minute, second=at.second, microsecond=0)
+    if candidate <= local:
+        candidate += dt.timedelta(days=1)
+    return candidate
+
+async def _run_job(job):
+    try:
+        await job()
+    except Exception:
+        # One bad run shouldn't end the schedule (tasks.loop would stop here).
+        logger.exception("Scheduled job %s failed", getattr(job, "__name__", job))
+
+async def daily(at: dt.time, job):
+    """Run `job()` every day at `at`, like tasks.loop(time=at) but on the installed clock."""
+    target = next_run(at, now(at.tzinfo))
+    while True:
+        await sleep_until(target)
+        await _run_job(job)
+        # Step from the previous target so an early wake-up can't run the job twice.
+        target = next_run(at, max(target, now(at.tzinfo)))
+
+async def every(seconds: float, job, first_delay: float = 0):
+    """Run `job()` after `first_delay` and then every `seconds`, like tasks.loop(seconds=...)."""
+    await sleep(first_delay)
+    while True:
+        await _run_job(job)
+        await sleep(seconds)
@@ -1,31 +1,89 @@
-import discord, aiohttp, json, os
+import discord, asyncio, csv, io, re
 from discord.ext import commands
-from database import link_leetcode_user, get_user
-from graphql_queries import QUERY_IF_USER_EXISTS
+from database import link_leetcode_user, get_user, upsert_users
+from leetcode_api import users_exist, get_session, LeetCodeError
+from cogs.admin import is_admin
+
+MENTION_RE = re.compile(r"<@!?(\d+)>")
+
+def parse_link_rows(text: str) -> list[tuple[str, str]]:
+    """(discord_id, leetcode_username) pairs from CSV rows `discord,username`; header rows are skipped."""
+    pairs = []
+    for row in csv.reader(io.StringIO(text)):
+        if len(row) < 2:
+            continue
+        who, username = row[0].strip(), row[1].strip()
+        match = MENTION_RE.fullmatch(who)
+        discord_id = match.group(1) if match else who
+        if discord_id.isdigit() and username:
+            pairs.append((discord_id, username))
+    return pairs
+
+def parse_mention_pairs(text: str) -> list[tuple[str, str]]:
+    """(discord_id, leetcode_username) pairs from `@user username @user username ...`."""
+    tokens = text.split()
+    pairs = []
+    for i, token in enumerate(tokens[:-1]):
+        match = MENTION_RE.fullmatch(token)
+        if match and not MENTION_RE.fullmatch(tokens[i + 1]):
+            pairs.append((match.group(1), tokens[i + 1]))
+    return pairs
+
 class Account(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @commands.command()
     async def linkleetcode(self, ctx, username):
-        # LeetCode GraphQL endpoint to check if the username exists
-        
-        variables = {"username": username}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://leetcode.com/graphql", json={"query": QUERY_IF_USER_EXISTS, "variables": variables}) as resp:
-                data = await resp.json()
-                user = data.get("data", {}).get("matchedUser", None)
-                if not user:
-                    await ctx.send("❌ Username doesn't exist on LeetCode.")
-                    return
+        # Existence check goes through the shared session, rate limit and negative cache.
+        try:
+            canonical = (await users_exist(get_session(), [username]))[username]
+        except LeetCodeError:
+            await ctx.send("⚠️ Couldn't reach LeetCode. Try again later.")
+            return
+        if not canonical:
+            await ctx.send("❌ Username doesn't exist on LeetCode.")
+            return
 
         discord_id = str(ctx.author.id)
-        await ctx.send(f"✅ Linked to {username}!")
-        
+        await ctx.send(f"✅ Linked to {canonical}!")
+
+        await asyncio.to_thread(link_leetcode_user, discord_id, canonical)
+
+    @commands.command()
+    @is_admin()
+    async def linkmany(self, ctx):
+        """
+        Usage: !linkmany @user1 name1 @user2 name2 ...
+               !linkmany  (with a CSV attachment of `discord_id_or_mention,leetcode_username` rows)
+        Validates every username concurrently and links all valid ones in one bulk write.
+        """
+        if ctx.message.attachments:
+            text = (await ctx.message.attachments[0].read()).decode("utf-8", errors="replace")
+            pairs = parse_link_rows(text)
+        else:
+            pairs = parse_mention_pairs(ctx.message.content)
+        if not pairs:
+            await ctx.send("Usage: `!linkmany @user name ...` or attach a CSV of `discord_id,leetcode_username` rows.")
+            return
+
+        try:
+            found = await users_exist(get_session(), [username for _, username in pairs])
+        except LeetCodeError:
+            await ctx.send("⚠️ Couldn't reach LeetCode. Try again later.")
+            return
+
+        rows = [{"discord_id": did, "leetcode_username": found[name]} for did, name in pairs if found.get(name)]
+        invalid = sorted({name for _, name in pairs if not found.get(name)})
+        failures = await asyncio.to_thread(upsert_users, rows) if rows else []
+
+        lines = [f"✅ Linked {len(rows) - len(failures)} of {len(pairs)} accounts."]
+        if invalid:
+            lines.append(f"❌ Not on LeetCode: {', '.join(f'`{n}`' for n in invalid)}")
+        for row, error in failures:
+            lines.append(f"⚠️ <@{row['discord_id']}> → `{row['leetcode_username']}`: {error[:100]}")
+        await ctx.send("\n".join(lines))
 
-        link_leetcode_user(discord_id, username)        
-        
 
 async def setup(bot):
     await bot.add_cog(Account(bot))
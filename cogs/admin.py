@@ -0,0 +1,106 @@
+# cogs/admin.py
+
+import asyncio
+import io
+import discord
+from discord.ext import commands
+from diagnostics import LoopLagWatchdog, ProfileSession, MAX_PROFILE_SECONDS
+from log_pipeline import dropped_records
+
+ADMIN_ID = 815555652780294175
+
+def is_admin():
+    async def predicate(ctx):
+        return ctx.author.id == ADMIN_ID or await ctx.bot.is_owner(ctx.author)
+    return commands.check(predicate)
+
+def format_runtime(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m {secs}s" if hours else f"{minutes}m {secs}s"
+
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.watchdog = LoopLagWatchdog()
+        self.profile: ProfileSession | None = None
+
+    async def cog_load(self):
+        self.bot.supervisor.spawn("loop-watchdog", self.watchdog.heartbeat, group="diagnostics", restart=True, replace=True)
+
+    async def cog_unload(self):
+        await self.bot.supervisor.cancel_group("diagnostics")
+        if self.profile:
+            self.profile.stop()
+            self.profile = None
+
+    @commands.command(name="tasks")
+    @is_admin()
+    async def tasks(self, ctx):
+        """
+        Usage: !tasks
+        Lists every supervised background task with its group and runtime.
+        """
+        running = self.bot.supervisor.running()
+        if not running:
+            await ctx.send("ℹ️ No background tasks running.")
+            return
+        lines = [
+            f"{info.group:<10} {info.name:<32} {format_runtime(info.runtime):>12}"
+            + (f"  (restarted {info.restarts}x)" if info.restarts else "")
+            for info in running
+        ]
+        await ctx.send("```" + "\n".join(lines) + "```")
+
+    @commands.command(name="lag")
+    @is_admin()
+    async def lag(self, ctx):
+        """
+        Usage: !lag
+        Shows the event-loop lag watchdog's current numbers and how many
+        log records were dropped because the log queue was full.
+        """
+        await ctx.send(f"⏱️ Event loop: {self.watchdog.summary()}\n📝 Log records dropped: {dropped_records()}")
+
+    @commands.command(name="profile")
+    @is_admin()
+    async def profile_cmd(self, ctx, action: str, seconds: int = 60):
+        """
+        Usage: !profile start [seconds] | !profile stop
+        Profiles the running bot for a bounded window (max 5 minutes) and
+        uploads the report sorted by cumulative time.
+        """
+        if action == "start":
+            if self.profile:
+                await ctx.send("❌ A profile is already running. Use `!profile stop`.")
+                return
+            self.profile = ProfileSession(max(1, seconds))
+            self.profile.start()
+            self.bot.supervisor.spawn("profile", lambda: self._auto_stop(ctx.channel), group="diagnostics", replace=True)
+            await ctx.send(f"🔬 Profiling for up to {int(self.profile.seconds)}s (cap {MAX_PROFILE_SECONDS}s).")
+        elif action == "stop":
+            if not self.profile:
+                await ctx.send("ℹ️ No profile is running.")
+                return
+            await self.bot.supervisor.cancel("profile")
+            await self._upload(ctx.channel)
+        else:
+            await ctx.send("Usage: `!profile start [seconds]` or `!profile stop`")
+
+    async def _auto_stop(self, channel):
+        await asyncio.sleep(self.profile.seconds)
+        await self._upload(channel)
+
+    async def _upload(self, channel):
+        session, self.profile = self.profile, None
+        if session is None:
+            return
+        report = session.stop()
+        await channel.send(
+            f"📄 Profile report ({self.watchdog.summary()})",
+            file=discord.File(io.BytesIO(report), filename="profile.txt"),
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
@@ -1,8 +1,21 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import aiohttp
+import asyncio
+import logging
+import os
 from datetime import datetime, timezone
 from graphql_queries import UPCOMING_CONTESTS_QUERY
+from leetcode_api import graphql, get_json, LeetCodeError, CONTEST_RANKING_URL
+from contest_history import get_contest_history
+from database import get_linked_users
+
+logger = logging.getLogger("leetcode_bot")
+
+RESULTS_CHANNEL_ID = int(os.getenv("CONTEST_RESULTS_CHANNEL_ID") or 0)   # 0: automatic results are off
+EMBED_DESCRIPTION_LIMIT = 4096
+RANKING_PAGE_DELAY = 0.3     # seconds between ranking pages
+MAX_RANKING_PAGES = 2000     # 25 rows per page, so ~50k participants
 
 def format_relative(ts: int) -> str:
     """
@@ -41,10 +54,137 @@ def format_relative(ts: int) -> str:
         return "• " + " ".join(parts) + " ago"
 
 
+async def iter_ranking(session: aiohttp.ClientSession, contest_slug: str):
+    """
+    Yield (participants, page_rows) one ranking page at a time. Only the
+    current page is ever held in memory, however large the contest.
+    """
+    url = CONTEST_RANKING_URL.format(slug=contest_slug)
+    for page in range(1, MAX_RANKING_PAGES + 1):
+        data = await get_json(session, url, params={"pagination": page, "region": "global"})
+        rows = data.get("total_rank") or []
+        if not rows:
+            return
+        yield data.get("user_num"), rows
+        await asyncio.sleep(RANKING_PAGE_DELAY)
+
+
+async def ingest_contest(session: aiohttp.ClientSession, contest_slug: str, members: dict[str, str]):
+    """
+    Stream the ranking, keep rows whose username is in `members`
+    (lowercased LeetCode username → Discord ID), and stop as soon as every
+    member has been seen. Returns (found rows, participant count).
+    """
+    remaining = set(members)
+    found, participants = [], None
+    async for participants, rows in iter_ranking(session, contest_slug):
+        for row in rows:
+            name = (row.get("username") or "").lower()
+            if name in remaining:
+                remaining.discard(name)
+                found.append({
+                    "username": row["username"],
+                    "discord_id": members[name],
+                    "rank": int(row["rank"]),
+                    "score": int(row["score"]),
+                    "finish_time": row.get("finish_time"),
+                })
+        if not remaining:
+            break
+    get_contest_history().record_results(contest_slug, found, participants)
+    return found, participants
+
+
 class UpcomingContests(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        if not RESULTS_CHANNEL_ID:
+            # Ingesting with nowhere to post would mark contests done and drop their results.
+            logger.error("CONTEST_RESULTS_CHANNEL_ID is not set; automatic contest results are disabled",
+                         extra={"operation": "contest_ingest"})
+            return
+        self.ingest_finished.start()
+
+    async def cog_unload(self):
+        self.ingest_finished.cancel()
+
+    async def linked_members(self) -> dict[str, str]:
+        users = await asyncio.to_thread(get_linked_users)
+        return {u["leetcode_username"].lower(): u["discord_id"] for u in users}
+
+    def results_embed(self, title: str, found: list[dict], participants: int | None) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"📊 {title} — Server Results",
+            color=discord.Color.blurple(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        if participants:
+            embed.set_footer(text=f"{participants:,} participants worldwide")
+        if not found:
+            embed.description = "No linked members took part."
+            return embed
+        lines, length = [], 0
+        ranked = sorted(found, key=lambda r: r["rank"])
+        for i, row in enumerate(ranked, start=1):
+            medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(i, f"{i}.")
+            line = f"{medal} <@{row['discord_id']}> (`{row['username']}`) — rank **{row['rank']:,}**, score {row['score']}"
+            # Leave room for the "and N more" line within Discord's description limit.
+            if length + len(line) + 1 > EMBED_DESCRIPTION_LIMIT - 40:
+                lines.append(f"…and {len(ranked) - i + 1} more")
+                break
+            lines.append(line)
+            length += len(line) + 1
+        embed.description = "\n".join(lines)
+        return embed
+
+    async def remember_upcoming(self, session: aiohttp.ClientSession):
+        result = await graphql(session, UPCOMING_CONTESTS_QUERY)
+        get_contest_history().remember((result.get("data") or {}).get("upcomingContests") or [])
+
+    @tasks.loop(minutes=30)
+    async def ingest_finished(self):
+        """Remember upcoming contests, and post results for ones that finished."""
+        async with aiohttp.ClientSession() as session:
+            try:
+                await self.remember_upcoming(session)
+            except LeetCodeError as e:
+                logger.warning("Could not refresh upcoming contests: %s", e, extra={"operation": "upcoming_contests"})
+            channel = self.bot.get_channel(RESULTS_CHANNEL_ID)
+            if channel is None:
+                # Leave contests due, so they're ingested once the channel is reachable.
+                logger.error("Contest results channel %s not found; skipping ingest", RESULTS_CHANNEL_ID,
+                             extra={"operation": "contest_ingest"})
+                return
+            for slug, title in get_contest_history().due():
+                try:
+                    found, participants = await ingest_contest(session, slug, await self.linked_members())
+                except LeetCodeError as e:
+                    logger.warning("Contest ingest for %s failed, will retry: %s", slug, e,
+                                   extra={"operation": "contest_ingest", "contest": slug})
+                    continue
+                await channel.send(embed=self.results_embed(title, found, participants))
+
+    @ingest_finished.before_loop
+    async def before_ingest(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command(name="contestresults")
+    async def contestresults(self, ctx, contest_slug: str):
+        """
+        Usage: !contestresults weekly-contest-400
+        Streams the contest ranking and posts how linked members placed.
+        """
+        await ctx.send(f"🔎 Scanning `{contest_slug}` rankings for linked members...")
+        async with aiohttp.ClientSession() as session:
+            try:
+                found, participants = await ingest_contest(session, contest_slug, await self.linked_members())
+            except LeetCodeError:
+                await ctx.send("⚠️ Failed to fetch that contest's ranking.")
+                return
+        await ctx.send(embed=self.results_embed(contest_slug, found, participants))
+
     @commands.command(name="contest")
     async def upcoming(self, ctx):
         """
@@ -52,18 +192,14 @@ class UpcomingContests(commands.Cog):
         Fetches LeetCode’s upcoming contests via GraphQL and sends an embed.
         """
         async with aiohttp.ClientSession() as session:
-            payload = {"query": UPCOMING_CONTESTS_QUERY}
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0"
-            }
-            async with session.post("https://leetcode.com/graphql", json=payload, headers=headers) as resp:
-                if resp.status != 200:
-                    await ctx.send("⚠️ Failed to fetch upcoming contests.")
-                    return
-                result = await resp.json()
+            try:
+                result = await graphql(session, UPCOMING_CONTESTS_QUERY)
+            except LeetCodeError:
+                await ctx.send("⚠️ Failed to fetch upcoming contests.")
+                return
 
         contests = result.get("data", {}).get("upcomingContests", [])
+        get_contest_history().remember(contests or [])
         if not contests:
             await ctx.send("ℹ️ No upcoming contests found.")
             return
@@ -1,40 +1,61 @@
 import discord
 from discord.ext import commands
-import aiohttp, random, asyncio, json, os
-import datetime as dt
 from collections import defaultdict
-from graphql_queries import QUERY_DUEL_PROBLEM, QUERY_SINGLE_PROBLEM, QUERY_USER_SOLVED
+import clock
+import jsoncodec
+from leetcode_api import random_problems, get_session
+from catalog import get_catalog
+from solved_index import get_solved_index
+from submission_history import get_history
+from submission_poller import get_poller
+from live_message import LiveMessage
+from supervisor import TaskLimitReached
 
 DUEL_TIMEOUT = 30 * 60  # 30 minutes
 DUELS = defaultdict(list)
 USERNAME_FILE = "usernames.json"
 
-# Load usernames
-if os.path.exists(USERNAME_FILE):
-    with open(USERNAME_FILE, "r") as f:
-        USERNAMES = json.load(f)
-else:
-    USERNAMES = {}
+_usernames = None
+
+def get_usernames():
+    """Load usernames on first use instead of at import time."""
+    global _usernames
+    if _usernames is None:
+        _usernames = jsoncodec.load_file(USERNAME_FILE, {})
+    return _usernames
 
 class Duel(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_unload(self):
+        # Don't leave pollers running against LeetCode after a reload.
+        await self.bot.supervisor.cancel_group("duels")
+        await self.bot.supervisor.cancel_group("duel-prep")
+
     @commands.command()
     async def duel(self, ctx, opponent: discord.Member):
         if ctx.channel.id in DUELS:
             await ctx.send("❌ A duel is already in progress here.")
             return
+        if not self.bot.supervisor.has_capacity("duels"):
+            await ctx.send("❌ Too many duels running right now. Try again in a bit.")
+            return
 
         challenger_id, opponent_id = str(ctx.author.id), str(opponent.id)
+        usernames = get_usernames()
 
-        if challenger_id not in USERNAMES:
+        if challenger_id not in usernames:
             await ctx.send(f"❌ Link your username using `!linkleetcode`.")
             return
-        if opponent_id not in USERNAMES:
+        if opponent_id not in usernames:
             await ctx.send(f"❌ {opponent.mention} hasn't linked their username.")
             return
 
+        players = [usernames[challenger_id], usernames[opponent_id]]
+        # Warm the catalog and both solved sets while the challenger picks a difficulty.
+        self.bot.supervisor.spawn(f"duel-prep:{ctx.channel.id}", lambda: self.prepare_selection(players), group="duel-prep", replace=True)
+
         class DifficultyDropdown(discord.ui.Select):
             def __init__(self, cog):
                 options = [discord.SelectOption(label=d, value=d.upper()) for d in ["Easy", "Medium", "Hard"]]
@@ -48,7 +69,7 @@ class Duel(commands.Cog):
 
                 difficulty = self.values[0]
                 await interaction.response.send_message(f"Fetching a {difficulty} problem...")
-                problem = await self.cog.fetch_random_problem(difficulty)
+                problem = await self.cog.fetch_random_problem(difficulty, players)
                 if not problem:
                     await ctx.send("Couldn't fetch a problem. Try again later.")
                     return
@@ -62,10 +83,19 @@ class Duel(commands.Cog):
                     "slug": slug,
                     "challenger": ctx.author,
                     "opponent": opponent,
-                    "start_time": dt.datetime.now(dt.timezone.utc).timestamp()
+                    "start_time": clock.time()
                 }
+                try:
+                    self.cog.bot.supervisor.spawn(
+                        f"duel:{ctx.channel.id}",
+                        lambda: self.cog.watch_duel(ctx.channel, duel_data),
+                        group="duels",
+                        on_exit=lambda info, exc: self.cog.end_duel(ctx.channel, duel_data, exc),
+                    )
+                except TaskLimitReached:
+                    await ctx.send("❌ Too many duels running right now. Try again in a bit.")
+                    return
                 DUELS[ctx.channel.id].append(duel_data)
-                self.cog.bot.loop.create_task(self.cog.watch_duel(ctx.channel, duel_data))
 
         class DuelView(discord.ui.View):
             def __init__(self, cog):
@@ -74,51 +104,72 @@ class Duel(commands.Cog):
 
         await ctx.send(f"⚔️ {ctx.author.mention} vs {opponent.mention}!", view=DuelView(self))
 
-    async def fetch_random_problem(self, difficulty):
-        
-        async with aiohttp.ClientSession() as session:
-            for _ in range(10):
-                vars = {"categorySlug": "", "skip": random.randint(0, 500), "limit": 1, "filters": {"difficulty": difficulty}}
-                async with session.post("https://leetcode.com/graphql", json={"query": QUERY_DUEL_PROBLEM, "variables": vars}) as resp:
-                    data = await resp.json()
-                    questions = data["data"]["problemsetQuestionList"]["questions"]
-                    if questions:
-                        question = questions[0]
-                        slug = question["titleSlug"]
-                        async with session.post("https://leetcode.com/graphql", json={"query": QUERY_SINGLE_PROBLEM, "variables": {"titleSlug": slug}}) as sub_resp:
-                            sub_data = await sub_resp.json()
-                            if not sub_data["data"]["question"]["isPaidOnly"]:
-                                return question
+    async def prepare_selection(self, players):
+        """Load the catalog and seed solved sets for players the index hasn't seen yet."""
+        index = get_solved_index()
+        session = get_session()
+        await get_catalog().ensure_loaded(session)
+        for username in players:
+            if not index.knows(username):
+                await get_history().sync(session, username)
+
+    async def fetch_random_problem(self, difficulty, players=()):
+        """Pick a problem neither player is known to have solved, straight from the local index."""
+        if len(get_catalog()):
+            index = get_solved_index()
+            await index.refresh()
+            problem = index.pick_fresh(players, difficulty)
+            if problem:
+                return problem
+
+        session = get_session()
+        for _ in range(3):
+            problems = await random_problems(session, difficulty)
+            if problems:
+                return problems[0]
         return None
 
-    async def has_solved(self, username, slug, since_timestamp):
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://leetcode.com/graphql", json={"query": QUERY_USER_SOLVED, "variables": {"username": username, "limit": 2}}) as resp:
-                data = await resp.json()
-                for sub in data.get("data", {}).get("recentAcSubmissionList", []):
-                    if sub["titleSlug"] == slug and int(sub["timestamp"]) >= since_timestamp:
-                        return True
-        return False
+    def has_solved(self, username, slug, since_timestamp):
+        # The shared poller keeps the history store current; this is a local lookup.
+        return get_history().solved_since(username, slug, since_timestamp)
 
     async def watch_duel(self, channel, duel):
         slug, challenger, opponent, start = duel.values()
         timeout = start + DUEL_TIMEOUT
         winner = None
-        while dt.datetime.now(dt.timezone.utc).timestamp() < timeout:
-            for user in [challenger, opponent]:
-                uid = str(user.id)
-                if uid in USERNAMES and await self.has_solved(USERNAMES[uid], slug, start):
-                    winner = user
+        usernames = get_usernames()
+        status = LiveMessage(channel, min_interval=30)
+        poller = get_poller()
+        owner = ("duel", channel.id)
+        poller.watch(self.bot.supervisor, owner, [usernames[str(u.id)] for u in (challenger, opponent) if str(u.id) in usernames])
+        try:
+            while clock.time() < timeout:
+                # Minute granularity, so most polls render identical text and skip the edit.
+                left = int(timeout - clock.time()) // 60
+                status.update(f"⏳ {challenger.display_name} vs {opponent.display_name} — `{slug}` — {left + 1} min left")
+                for user in [challenger, opponent]:
+                    uid = str(user.id)
+                    if uid in usernames and self.has_solved(usernames[uid], slug, start):
+                        winner = user
+                        break
+                if winner:
                     break
-            if winner:
-                break
-            await asyncio.sleep(5)
+                await clock.sleep(5)
+        finally:
+            poller.unwatch(owner)
 
         result_msg = f"🏆 {winner.mention} wins!" if winner else "⏰ Draw! No solutions submitted."
+        await status.close(f"🏁 {challenger.display_name} vs {opponent.display_name} — `{slug}` — finished")
         await channel.send(result_msg)
-        DUELS[channel.id].remove(duel)
-        if not DUELS[channel.id]:
-            del DUELS[channel.id]
+
+    def end_duel(self, channel, duel, exc):
+        """Supervisor exit hook: always unlock the channel, even if the watcher crashed."""
+        if duel in DUELS.get(channel.id, []):
+            DUELS[channel.id].remove(duel)
+            if not DUELS[channel.id]:
+                del DUELS[channel.id]
+        if exc is not None:
+            self.bot.loop.create_task(channel.send("⚠️ Lost track of this duel, so it has been called off."))
 
 async def setup(bot):
     await bot.add_cog(Duel(bot))
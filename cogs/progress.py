@@ -1,16 +1,101 @@
 # cogs/progress.py
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import aiohttp
-import json
+import asyncio
+import logging
+import time
 from datetime import datetime, timezone
-from database import get_user
+from database import get_user, get_linked_users, get_solved_leaderboard, UserBatchWriter
+from calendar_history import get_calendar_history, day_index
 from graphql_queries import LEETCODE_STATS_QUERY
+from leetcode_api import graphql, get_session, LeetCodeError, STATS_TTL
+from recommender import get_recommender, DEFAULT_K
+from solved_index import get_solved_index
+from submission_history import get_history
+
+logger = logging.getLogger("leetcode_bot")
+
+SOLVEDBOARD_PAGE_SIZE = 10
+MAX_RECOMMENDATIONS = 10
+DIFFICULTY_EMOJI = {"Easy": "🟢", "Medium": "🟡", "Hard": "🔴"}
 
 class ProgressTracker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._stats_cache: dict[str, tuple[float, dict]] = {}
+
+    async def cog_load(self):
+        self.refresh_solved_snapshot.start()
+
+    async def cog_unload(self):
+        self.refresh_solved_snapshot.cancel()
+
+    async def get_stats(self, session: aiohttp.ClientSession, username: str) -> dict | None:
+        """fetch_leetcode_stats, but reusing a payload fetched in the last STATS_TTL seconds."""
+        key = username.lower()
+        cached = self._stats_cache.get(key)
+        if cached and time.time() - cached[0] < STATS_TTL:
+            return cached[1]
+        stats = await self.fetch_leetcode_stats(session, username)
+        if stats is not None:
+            self._stats_cache[key] = (time.time(), stats)
+        return stats
+
+    @staticmethod
+    def snapshot_row(stats: dict, last_ac: int | None) -> dict:
+        """
+        The users-table columns the solved leaderboard is served from.
+        `last_ac` is the latest accepted submission; the calendar's last
+        active day would count any submission, accepted or not.
+        """
+        return {
+            "total_solved": sum(stats["counts_by_diff"].values()),
+            "streak_count": stats["streak"],
+            "last_solved_date": datetime.fromtimestamp(last_ac, tz=timezone.utc).date().isoformat() if last_ac else None,
+        }
+
+    async def ensure_solved_history(self, session: aiohttp.ClientSession, username: str):
+        """Seed the solved index for a user it has never seen (recommendations read it)."""
+        if not get_solved_index().knows(username):
+            await get_history().sync(session, username)
+
+    @tasks.loop(hours=1)
+    async def refresh_solved_snapshot(self):
+        """
+        Materialize solved counts and streaks into Supabase for !solvedboard,
+        then re-rank !recommend picks for every linked user in one pass.
+        """
+        users = await asyncio.to_thread(get_linked_users)
+        writer = UserBatchWriter(max_rows=100, max_delay=30)
+        profiles = {}
+        async with aiohttp.ClientSession() as session:
+            for user in users:
+                try:
+                    # Pulls the latest ACs too, which seeds the solved index for new users.
+                    await get_history().sync(session, user["leetcode_username"])
+                    stats = await self.get_stats(session, user["leetcode_username"])
+                    if stats is not None:
+                        profiles[user["leetcode_username"]] = stats
+                        last_ac = get_history().last_ac(user["leetcode_username"])
+                        await writer.add(user["discord_id"], self.snapshot_row(stats, last_ac))
+                except Exception as e:
+                    logger.error("Solved snapshot refresh failed for %s: %s", user["leetcode_username"], e,
+                                 extra={"operation": "solved_snapshot", "user": user["discord_id"]})
+                await asyncio.sleep(0.5)
+        await writer.close()
+        for row, error in writer.failures:
+            logger.error("Solved snapshot write failed for %s: %s", row["discord_id"], error,
+                         extra={"operation": "solved_snapshot_write", "user": row["discord_id"]})
+        try:
+            await get_recommender().precompute([user["leetcode_username"] for user in users], profiles)
+        except Exception as e:
+            logger.error("Recommendation precompute failed: %s", e, extra={"operation": "recommend_precompute"})
+
+    @refresh_solved_snapshot.before_loop
+    async def before_refresh(self):
+        await self.bot.wait_until_ready()
 
     async def fetch_leetcode_stats(self, session: aiohttp.ClientSession, username: str) -> dict | None:
         """
@@ -18,31 +103,20 @@ class ProgressTracker(commands.Cog):
         parses it into a more convenient Python dict:
          - solved counts by difficulty (Easy/Medium/Hard)
          - beat‐percentiles by difficulty (Easy/Medium/Hard)
-         - calendar map (midnight‐UTC → #solved) as dict[int,int]
-         - streak (int)
+         - lifetime solved count per topic tag (tag slug → count)
+         - calendar map (midnight‐UTC → #solved) as dict[int,int], last 30 days
+         - streak (int), plus longest-ever streak, per-year totals and
+           lifetime activity from the multi-year calendar store
         """
-        year = datetime.utcnow().year
-        payload = {
-            "query": LEETCODE_STATS_QUERY,
-            "variables": {
-                "username": username,
-                "year": year,
-                "recentN": 1000
-            }
-        }
+        variables = {"username": username}
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-            "Content-Type": "application/json"
-        }
-
-        async with session.post("https://leetcode.com/graphql", json=payload, headers=headers) as resp:
-            if resp.status != 200:
-                return None
-            result = await resp.json()
-            data = result.get("data", {})
-            if not data or not data.get("matchedUser"):
-                return None
+        try:
+            result = await graphql(session, LEETCODE_STATS_QUERY, variables, ttl=STATS_TTL)
+        except LeetCodeError:
+            return None
+        data = result.get("data", {})
+        if not data or not data.get("matchedUser"):
+            return None
 
         mu = data["matchedUser"]
         # 1) Difficulty breakdown (Easy/Medium/Hard only):
@@ -61,20 +135,33 @@ class ProgressTracker(commands.Cog):
             if entry["difficulty"] in ("Easy", "Medium", "Hard")
         }
 
-        # 3) Calendar + streak:
-        cal_str = mu["userCalendar"]["submissionCalendar"]
+        # 3) Lifetime solves per topic tag (tags sit in exactly one skill level):
+        solved_by_tag: dict[str, int] = {
+            entry["tagSlug"]: entry["problemsSolved"]
+            for level in (mu.get("tagProblemCounts") or {}).values()
+            for entry in level or []
+        }
+
+        # 4) Calendar + streak (past years come from the local store):
+        calendars = get_calendar_history()
         try:
-            cal_map: dict[str, int] = json.loads(cal_str)
-        except json.JSONDecodeError:
-            cal_map = {}
-        cal_map = {int(k): v for k, v in cal_map.items()}
-        streak = mu["userCalendar"]["streak"]
+            current = await calendars.refresh(session, username)
+        except LeetCodeError:
+            current = None
+        year, today = day_index(int(time.time()))
+        total, active_days = calendars.lifetime(username)
 
         return {
             "counts_by_diff": counts_by_diff,
             "beats_by_diff": beats_by_diff,
-            "calendar": cal_map,
-            "streak": streak
+            "solved_by_tag": solved_by_tag,
+            "calendar": calendars.recent(username, 30),
+            "streak": current["streak"] if current else 0,
+            "longest_streak": calendars.longest_streak(username),
+            "year_to_date": calendars.year_totals(username, through_day=today),
+            "lifetime_submissions": total,
+            "lifetime_active_days": active_days,
+            "last_active_day": calendars.last_active_day(username),
         }
 
     def _compute_time_buckets(self, cal_map: dict[int, int]) -> dict[str, int]:
@@ -125,7 +212,7 @@ class ProgressTracker(commands.Cog):
         leetcode_name = entry["leetcode_username"]
 
         async with aiohttp.ClientSession() as session:
-            stats = await self.fetch_leetcode_stats(session, leetcode_name)
+            stats = await self.get_stats(session, leetcode_name)
             if stats is None:
                 await ctx.send(f"⚠️ Couldn’t fetch LeetCode stats for `{leetcode_name}`. Are you sure the username is correct?")
                 return
@@ -192,10 +279,107 @@ class ProgressTracker(commands.Cog):
 
         embed.add_field(
             name="🔥 Current Streak",
-            value=f"`{streak}` days",
+            value=f"`{streak}` days (longest ever: `{stats['longest_streak']}`)",
             inline=False
         )
 
+        # Year-over-year, each year counted up to today's day of the year:
+        ytd = stats["year_to_date"]
+        if ytd:
+            this_year = datetime.now(timezone.utc).year
+            lines = [f"{year}: `{count}`" for year, count in sorted(ytd.items(), reverse=True)[:5]]
+            if this_year in ytd and this_year - 1 in ytd:
+                diff = ytd[this_year] - ytd[this_year - 1]
+                lines[0] += f" ({'+' if diff >= 0 else ''}{diff} vs last year)"
+            embed.add_field(
+                name="📚 Submissions by Year (to date)",
+                value="\n".join(lines) + (
+                    f"\nLifetime: `{stats['lifetime_submissions']}` over "
+                    f"`{stats['lifetime_active_days']}` active days"
+                ),
+                inline=False
+            )
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="solvedboard")
+    async def solvedboard(self, ctx, page: int = 1):
+        """
+        Usage: !solvedboard [page]
+        Ranks linked users by total problems solved, served from the snapshot
+        the background refresher keeps in the users table.
+        """
+        page = max(page, 1)
+        offset = (page - 1) * SOLVEDBOARD_PAGE_SIZE
+        rows, total = await asyncio.to_thread(get_solved_leaderboard, offset, SOLVEDBOARD_PAGE_SIZE)
+        if not rows:
+            await ctx.send("ℹ️ No solved counts on that page yet.")
+            return
+
+        pages = max((total or 0) + SOLVEDBOARD_PAGE_SIZE - 1, 1) // SOLVEDBOARD_PAGE_SIZE
+        lines = []
+        for rank, row in enumerate(rows, start=offset + 1):
+            member = ctx.guild.get_member(int(row["discord_id"])) if ctx.guild else None
+            name = member.display_name if member else row["leetcode_username"]
+            lines.append(f"**{rank}.** {name} — `{row['total_solved'] or 0}` solved · 🔥 {row['streak_count'] or 0}")
+
+        embed = discord.Embed(
+            title="🏅 Solved Leaderboard",
+            description="\n".join(lines),
+            color=discord.Color.gold(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        embed.set_footer(text=f"Page {page}/{pages} · refreshed hourly")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="recommend")
+    async def recommend(self, ctx, member: discord.Member = None, count: int = DEFAULT_K):
+        """
+        Usage: !recommend [@User] [count]
+        Suggests unsolved problems in the topics you have practised least,
+        pitched a little above the difficulty you usually solve.
+        """
+        if member is None:
+            member = ctx.author
+        count = min(max(count, 1), MAX_RECOMMENDATIONS)
+
+        entry = get_user(str(member.id))
+        if not entry or not entry.get("leetcode_username"):
+            await ctx.send(f"❌ `{member.display_name}` hasn’t linked a LeetCode username yet. Use `!linkleetcode` first.")
+            return
+
+        leetcode_name = entry["leetcode_username"]
+        session = get_session()
+        stats = await self.get_stats(session, leetcode_name)
+        try:
+            await self.ensure_solved_history(session, leetcode_name)
+        except LeetCodeError:
+            pass   # recommend from whatever history is already known
+        recommender = get_recommender()
+        result = await recommender.recommend(leetcode_name, stats, k=count)
+        if not result["problems"]:
+            if not len(recommender.catalog):
+                await ctx.send("⚠️ No recommendations right now: the problem catalog couldn’t be loaded. Try again later.")
+            else:
+                await ctx.send(f"🏆 `{leetcode_name}` has solved every free problem we know of. Nothing left to recommend!")
+            return
+
+        lines = []
+        for problem, _ in result["problems"]:
+            tags = ", ".join(tag["name"] for tag in problem.get("topicTags") or []) or "untagged"
+            lines.append(
+                f"{DIFFICULTY_EMOJI.get(problem['difficulty'], '⚪')} "
+                f"[{problem['title']}](https://leetcode.com/problems/{problem['titleSlug']}/) · {tags}"
+            )
+        embed = discord.Embed(
+            title=f"🎯 Recommended for {member.display_name}",
+            description="\n".join(lines),
+            color=discord.Color.blurple(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        if result["focus"]:
+            embed.add_field(name="Focus areas", value=", ".join(result["focus"]), inline=False)
+        embed.set_footer(text="Weakest topics first · re-ranked hourly")
         await ctx.send(embed=embed)
 
 
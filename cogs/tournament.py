@@ -0,0 +1,305 @@
+import discord
+from discord.ext import commands
+import logging
+import random
+import clock
+from catalog import get_catalog
+from solved_index import get_solved_index
+from submission_history import get_history
+from submission_poller import get_poller
+from live_message import LiveMessage
+from supervisor import TaskLimitReached
+from cogs.duel import get_usernames
+from leetcode_api import get_session
+
+logger = logging.getLogger("leetcode_bot")
+
+MAX_PLAYERS = 64
+CHECK_INTERVAL = 5       # seconds between standings refreshes (local lookups only)
+TOURNAMENTS = {}         # channel id → Tournament
+
+def now_ts() -> int:
+    return int(clock.time())
+
+def fmt_elapsed(seconds: int) -> str:
+    minutes, secs = divmod(seconds, 60)
+    return f"{minutes}:{secs:02d}"
+
+
+class Tournament:
+    """Lobby + state for one tournament in one channel."""
+
+    def __init__(self, host: discord.Member, mode: str, difficulty: str, problems: int, minutes: int):
+        self.host = host
+        self.mode = mode                  # "ffa" or "bracket"
+        self.difficulty = difficulty
+        self.problem_count = problems
+        self.minutes = minutes
+        self.players: dict[str, tuple[discord.Member, str]] = {}   # discord id → (member, leetcode username)
+        self.started = False
+
+    def usernames(self, ids=None) -> list[str]:
+        return [self.players[pid][1] for pid in (ids if ids is not None else self.players)]
+
+    def name(self, pid: str) -> str:
+        return self.players[pid][0].display_name
+
+
+class TournamentCog(commands.Cog, name="Tournament"):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_unload(self):
+        await self.bot.supervisor.cancel_group("tournaments")
+
+    @commands.group(name="tournament", invoke_without_command=True)
+    async def tournament(self, ctx):
+        """
+        Usage:
+          !tournament open <ffa|bracket> <easy|medium|hard> [problems] [minutes]
+          !tournament join | leave | start | cancel
+        FFA races everyone on one problem set; bracket runs single-elimination
+        head-to-heads, one fresh problem per match.
+        """
+        await ctx.send_help(ctx.command)
+
+    @tournament.command(name="open")
+    async def open_(self, ctx, mode: str, difficulty: str = "easy", problems: int = 1, minutes: int = 30):
+        mode, difficulty = mode.lower(), difficulty.upper()
+        if ctx.channel.id in TOURNAMENTS:
+            await ctx.send("❌ A tournament is already open in this channel.")
+            return
+        if mode not in ("ffa", "bracket") or difficulty not in ("EASY", "MEDIUM", "HARD"):
+            await ctx.send("Usage: `!tournament open <ffa|bracket> <easy|medium|hard> [problems] [minutes]`")
+            return
+        problems = 1 if mode == "bracket" else max(1, min(problems, 5))
+        minutes = max(5, min(minutes, 120))
+        TOURNAMENTS[ctx.channel.id] = Tournament(ctx.author, mode, difficulty, problems, minutes)
+        await self.add_player(ctx, ctx.author)
+        await ctx.send(
+            f"🏟️ {ctx.author.mention} opened a **{mode.upper()}** tournament "
+            f"({difficulty.capitalize()}, {problems} problem(s), {minutes} min). "
+            "Type `!tournament join` to enter."
+        )
+
+    async def add_player(self, ctx, member) -> bool:
+        t = TOURNAMENTS[ctx.channel.id]
+        usernames = get_usernames()
+        uid = str(member.id)
+        if uid not in usernames:
+            await ctx.send(f"❌ {member.mention} link your username using `!linkleetcode`.")
+            return False
+        if len(t.players) >= MAX_PLAYERS:
+            await ctx.send(f"❌ The tournament is full ({MAX_PLAYERS} players).")
+            return False
+        t.players[uid] = (member, usernames[uid])
+        return True
+
+    @tournament.command(name="join")
+    async def join(self, ctx):
+        t = TOURNAMENTS.get(ctx.channel.id)
+        if not t or t.started:
+            await ctx.send("❌ No tournament is open for joining here.")
+            return
+        if str(ctx.author.id) in t.players:
+            return
+        if await self.add_player(ctx, ctx.author):
+            await ctx.message.add_reaction("✅")
+
+    @tournament.command(name="leave")
+    async def leave(self, ctx):
+        t = TOURNAMENTS.get(ctx.channel.id)
+        if t and not t.started and t.players.pop(str(ctx.author.id), None):
+            await ctx.message.add_reaction("👋")
+
+    @tournament.command(name="cancel")
+    async def cancel(self, ctx):
+        t = TOURNAMENTS.get(ctx.channel.id)
+        if not t or ctx.author != t.host:
+            return
+        await self.bot.supervisor.cancel(f"tournament:{ctx.channel.id}")
+        TOURNAMENTS.pop(ctx.channel.id, None)
+        await ctx.send("🛑 Tournament cancelled.")
+
+    @tournament.command(name="start")
+    async def start(self, ctx):
+        t = TOURNAMENTS.get(ctx.channel.id)
+        if not t or t.started or ctx.author != t.host:
+            return
+        if len(t.players) < 2:
+            await ctx.send("❌ Need at least 2 players.")
+            return
+
+        # Closed to join/leave/start from here on, including while seeding awaits below.
+        t.started = True
+        session = get_session()
+        try:
+            await get_catalog().ensure_loaded(session)
+        except Exception:
+            t.started = False
+            raise
+        # Seed solved sets from recent ACs (all LeetCode exposes), so picks avoid what's known.
+        history, index = get_history(), get_solved_index()
+        for username in t.usernames():
+            if not index.knows(username):
+                try:
+                    await history.sync(session, username)
+                except Exception as e:
+                    logger.warning("Could not seed solved set for %s: %s", username, e,
+                                   extra={"operation": "tournament_seed", "user": username, "guild": ctx.guild.id if ctx.guild else None})
+
+        if TOURNAMENTS.get(ctx.channel.id) is not t:
+            return   # cancelled while seeding
+        runner = self.run_ffa if t.mode == "ffa" else self.run_bracket
+        try:
+            self.bot.supervisor.spawn(
+                f"tournament:{ctx.channel.id}",
+                lambda: runner(ctx.channel, t),
+                group="tournaments",
+                on_exit=lambda info, exc: self.end_tournament(ctx.channel, exc),
+            )
+        except TaskLimitReached:
+            t.started = False
+            await ctx.send("❌ Too many tournaments running right now. Try again later.")
+
+    def end_tournament(self, channel, exc):
+        TOURNAMENTS.pop(channel.id, None)
+        get_poller().unwatch(("tournament", channel.id))
+        if exc is not None:
+            self.bot.loop.create_task(channel.send("⚠️ Lost track of the tournament, so it has been called off."))
+
+    # ------------------------- Free-for-all -------------------------
+    def ffa_standings(self, t: Tournament, slugs: list[str], start: int):
+        """Rank by problems solved, then by time of the last solve."""
+        firsts = get_history().first_acs_since(t.usernames(), slugs, start)
+        rows = []
+        for pid, (member, username) in t.players.items():
+            times = [firsts.get((username.lower(), slug)) for slug in slugs]
+            done = [ts for ts in times if ts is not None]
+            rows.append((pid, len(done), max(done) - start if done else None))
+        rows.sort(key=lambda r: (-r[1], r[2] if r[2] is not None else float("inf")))
+        return rows
+
+    def render_ffa(self, t: Tournament, problems: list[dict], rows, left: int) -> str:
+        lines = [f"🏁 **FFA standings** — {max(left, 0) // 60 + 1} min left"]
+        lines += [f"`{p['titleSlug']}`" for p in problems]
+        for rank, (pid, solved, last) in enumerate(rows, start=1):
+            finish = f" ({fmt_elapsed(last)})" if last is not None else ""
+            lines.append(f"{rank}. {t.name(pid)} — {solved}/{len(problems)}{finish}")
+        return "\n".join(lines)
+
+    async def run_ffa(self, channel, t: Tournament):
+        index = get_solved_index()
+        await index.refresh()
+        problems = index.pick_fresh_set(t.usernames(), t.difficulty, t.problem_count)
+        if not problems:
+            await channel.send("Couldn't find a problem fresh for everyone. Try another difficulty.")
+            return
+        slugs = [p["titleSlug"] for p in problems]
+        links = "\n".join(f"**{p['title']}** — https://leetcode.com/problems/{p['titleSlug']}/" for p in problems)
+        await channel.send(f"🏟️ FFA starts now! {t.minutes} minutes.\n{links}")
+
+        start = now_ts()
+        deadline = start + t.minutes * 60
+        owner = ("tournament", channel.id)
+        poller = get_poller()
+        poller.watch(self.bot.supervisor, owner, t.usernames())
+        live = LiveMessage(channel, min_interval=10)
+        try:
+            while True:
+                rows = self.ffa_standings(t, slugs, start)
+                live.update(self.render_ffa(t, problems, rows, deadline - now_ts()))
+                if now_ts() >= deadline or all(solved == len(slugs) for _, solved, _ in rows):
+                    break
+                await clock.sleep(CHECK_INTERVAL)
+        finally:
+            poller.unwatch(owner)
+
+        await live.close(self.render_ffa(t, problems, rows, 0).replace("min left", "final"))
+        pid, solved, _ = rows[0]
+        if solved:
+            await channel.send(f"🏆 {t.players[pid][0].mention} wins the FFA!")
+        else:
+            await channel.send("⏰ Time's up — nobody solved anything.")
+
+    # ------------------------- Single elimination -------------------------
+    async def run_bracket(self, channel, t: Tournament):
+        entrants = list(t.players)
+        random.shuffle(entrants)
+        index = get_solved_index()
+        owner = ("tournament", channel.id)
+        poller = get_poller()
+        live = LiveMessage(channel, min_interval=10)
+        round_no = 1
+
+        while len(entrants) > 1:
+            # Pair up in seed order; an odd player out gets a bye.
+            pairs = [(entrants[i], entrants[i + 1]) for i in range(0, len(entrants) - 1, 2)]
+            byes = [entrants[-1]] if len(entrants) % 2 else []
+            matches = []
+            await index.refresh()
+            for a, b in pairs:
+                problem = index.pick_fresh(t.usernames([a, b]), t.difficulty)
+                if not problem:
+                    await channel.send(f"Couldn't find a problem fresh for {t.name(a)} and {t.name(b)}; {t.name(a)} advances.")
+                    byes.append(a)
+                    continue
+                matches.append({"a": a, "b": b, "slug": problem["titleSlug"], "winner": None, "note": ""})
+
+            listing = "\n".join(
+                f"⚔️ {t.name(m['a'])} vs {t.name(m['b'])} — https://leetcode.com/problems/{m['slug']}/" for m in matches
+            )
+            await channel.send(f"🥊 **Round {round_no}** — {t.minutes} minutes\n{listing}")
+
+            start = now_ts()
+            deadline = start + t.minutes * 60
+            poller.unwatch(owner)
+            poller.watch(self.bot.supervisor, owner, t.usernames([pid for m in matches for pid in (m["a"], m["b"])]))
+            try:
+                while matches and now_ts() < deadline and any(m["winner"] is None for m in matches):
+                    self.settle_matches(t, matches, start)
+                    live.update(self.render_round(t, round_no, matches, deadline - now_ts()))
+                    await clock.sleep(CHECK_INTERVAL)
+                self.settle_matches(t, matches, start)
+            finally:
+                poller.unwatch(owner)
+
+            for m in matches:
+                if m["winner"] is None:
+                    # Nobody solved it in time: the higher seed goes through.
+                    m["winner"], m["note"] = m["a"], " (on seed)"
+            await live.close(self.render_round(t, round_no, matches, 0))
+            live = LiveMessage(channel, min_interval=10)
+
+            winners = {m["winner"] for m in matches} | set(byes)
+            entrants = [pid for pid in entrants if pid in winners]
+            round_no += 1
+
+        await channel.send(f"🏆 {t.players[entrants[0]][0].mention} wins the bracket!")
+
+    def settle_matches(self, t: Tournament, matches: list[dict], start: int):
+        pending = [m for m in matches if m["winner"] is None]
+        if not pending:
+            return
+        users = t.usernames([pid for m in pending for pid in (m["a"], m["b"])])
+        firsts = get_history().first_acs_since(users, {m["slug"] for m in pending}, start)
+        for m in pending:
+            ta = firsts.get((t.players[m["a"]][1].lower(), m["slug"]))
+            tb = firsts.get((t.players[m["b"]][1].lower(), m["slug"]))
+            if ta is not None or tb is not None:
+                m["winner"] = m["a"] if tb is None or (ta is not None and ta <= tb) else m["b"]
+
+    def render_round(self, t: Tournament, round_no: int, matches: list[dict], left: int) -> str:
+        header = f"🥊 **Round {round_no}**" + (f" — {left // 60 + 1} min left" if left > 0 else " — final")
+        lines = [header]
+        for m in matches:
+            a, b = t.name(m["a"]), t.name(m["b"])
+            if m["winner"] is None:
+                lines.append(f"{a} vs {b} — ⏳")
+            else:
+                lines.append(f"{a} vs {b} — ✅ {t.name(m['winner'])}{m['note']}")
+        return "\n".join(lines)
+
+
+async def setup(bot):
+    await bot.add_cog(TournamentCog(bot))
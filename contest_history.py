@@ -0,0 +1,85 @@
+# contest_history.py
+
+import sqlite3
+import time
+from submission_history import HISTORY_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contests (
+    slug       TEXT PRIMARY KEY,
+    title      TEXT    NOT NULL,
+    start_time INTEGER NOT NULL,
+    duration   INTEGER NOT NULL,
+    ingested_at REAL
+);
+CREATE TABLE IF NOT EXISTS contest_results (
+    contest_slug TEXT    NOT NULL,
+    username     TEXT    NOT NULL,
+    discord_id   TEXT,
+    rank         INTEGER NOT NULL,
+    score        INTEGER NOT NULL,
+    finish_time  INTEGER,
+    participants INTEGER,
+    PRIMARY KEY (contest_slug, username)
+);
+CREATE INDEX IF NOT EXISTS contest_results_by_user ON contest_results (username, contest_slug);
+"""
+
+
+class ContestHistory:
+    """Known contests and every linked member's placement in them (in history.db)."""
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def remember(self, contests: list[dict]):
+        """Record upcoming contests so they can be ingested once they end."""
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT OR IGNORE INTO contests (slug, title, start_time, duration) VALUES (?, ?, ?, ?)",
+                [(c["titleSlug"], c["title"], int(c["startTime"]), int(c["duration"])) for c in contests],
+            )
+
+    def due(self, grace: int = 30 * 60) -> list[tuple[str, str]]:
+        """(slug, title) of contests that ended `grace` seconds ago and aren't ingested yet."""
+        return self.db.execute(
+            "SELECT slug, title FROM contests WHERE ingested_at IS NULL AND start_time + duration + ? <= ?",
+            (grace, int(time.time())),
+        ).fetchall()
+
+    def record_results(self, contest_slug: str, rows: list[dict], participants: int | None):
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT OR REPLACE INTO contest_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (contest_slug, r["username"].lower(), r.get("discord_id"), r["rank"], r["score"], r.get("finish_time"), participants)
+                    for r in rows
+                ],
+            )
+            self.db.execute(
+                "INSERT INTO contests (slug, title, start_time, duration, ingested_at) VALUES (?, ?, 0, 0, ?) "
+                "ON CONFLICT (slug) DO UPDATE SET ingested_at = excluded.ingested_at",
+                (contest_slug, contest_slug, time.time()),
+            )
+
+    def user_history(self, username: str, limit: int = 10) -> list[tuple]:
+        """(contest_slug, rank, score, participants), most recent contest first."""
+        return self.db.execute(
+            "SELECT r.contest_slug, r.rank, r.score, r.participants FROM contest_results r "
+            "LEFT JOIN contests c ON c.slug = r.contest_slug "
+            "WHERE r.username = ? ORDER BY c.start_time DESC LIMIT ?",
+            (username.lower(), limit),
+        ).fetchall()
+
+
+_contests = None
+
+def get_contest_history() -> ContestHistory:
+    global _contests
+    if _contests is None:
+        _contests = ContestHistory()
+    return _contests
@@ -0,0 +1,44 @@
+# daily_queue.py
+
+import jsoncodec
+
+DAILY_QUEUE_FILE = "daily_queue.json"
+QUEUE_DEPTH = 5   # days of problem sets kept ready
+
+
+class DailyQueue:
+    """
+    Problem sets picked and validated ahead of time, persisted across
+    restarts. Slugs are reserved in sent_problems.json once a set is
+    validated and queued, so posting is just a pop and never waits on
+    LeetCode.
+    """
+
+    def __init__(self, path: str = DAILY_QUEUE_FILE, depth: int = QUEUE_DEPTH):
+        self.path = path
+        self.depth = depth
+        self.entries: list[dict] = jsoncodec.load_file(path, [])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self):
+        jsoncodec.dump_file(self.path, self.entries)
+
+    def needs(self) -> int:
+        return max(0, self.depth - len(self.entries))
+
+    def push(self, problems: list[dict], for_date: str):
+        self.entries.append({"date": for_date, "problems": problems})
+        self.save()
+
+    def pop(self) -> list[dict] | None:
+        if not self.entries:
+            return None
+        entry = self.entries.pop(0)
+        self.save()
+        return entry["problems"]
+
+    def reserved_slugs(self) -> list[str]:
+        """Slugs of every queued set, oldest first."""
+        return [q["titleSlug"] for entry in self.entries for q in entry["problems"]]
@@ -1,16 +1,27 @@
-from supabase import create_client, Client
+import asyncio
 import os
+import time
 
 # Load environment variables
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+BULK_CHUNK_SIZE = 500   # rows per bulk request
+
+_client = None
+
+# Build the Supabase client on first use; importing supabase is slow and
+# most cogs never touch the database during startup.
+def get_client():
+    global _client
+    if _client is None:
+        from supabase import create_client
+        _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
 
 # Link LeetCode username to Discord ID
 def link_leetcode_user(discord_id: str, leetcode_username: str):
-    data, count = supabase.table("users").upsert({
+    data, count = get_client().table("users").upsert({
         "discord_id": discord_id,
         "leetcode_username": leetcode_username,
     }).execute()
@@ -18,28 +29,131 @@ def link_leetcode_user(discord_id: str, leetcode_username: str):
 
 # Get user by Discord ID
 def get_user(discord_id: str):
-    data = supabase.table("users").select("*").eq("discord_id", discord_id).execute()
+    data = get_client().table("users").select("*").eq("discord_id", discord_id).execute()
     if data.data:
         return data.data[0]
     return None
 
 # Get all users for leaderboard
 def get_all_users():
-    data = supabase.table("users").select("*").execute()
+    data = get_client().table("users").select("*").execute()
     return data.data
 
+# Only the columns background jobs need, for every user with a linked account
+def get_linked_users():
+    data = (
+        get_client().table("users")
+        .select("discord_id, leetcode_username")
+        .not_.is_("leetcode_username", "null")
+        .execute()
+    )
+    return data.data
+
+# Ranked page of the materialized solved-count snapshot (one indexed read)
+def get_solved_leaderboard(offset: int = 0, limit: int = 10):
+    data = (
+        get_client().table("users")
+        .select("discord_id, leetcode_username, total_solved, streak_count, last_solved_date", count="exact")
+        .not_.is_("leetcode_username", "null")
+        .not_.is_("total_solved", "null")   # not snapshotted yet; DESC would sort NULLs first
+        .order("total_solved", desc=True)
+        .range(offset, offset + limit - 1)
+        .execute()
+    )
+    return data.data, data.count
+
 # Update user progress (streak, total_solved, etc.)
 def update_user(discord_id: str, updates: dict):
-    supabase.table("users").update(updates).eq("discord_id", discord_id).execute()
+    get_client().table("users").update(updates).eq("discord_id", discord_id).execute()
 
 # OPTIONAL: Create a new user if not exists (for registration)
 def create_user(discord_id: str, leetcode_username: str):
-    existing = get_user(discord_id)
-    if not existing:
-        supabase.table("users").insert({
-            "discord_id": discord_id,
-            "leetcode_username": leetcode_username,
-            "streak_count": 0,
-            "last_solved_date": None,
-            "total_solved": 0
-        }).execute()
+    # Idempotent: an existing row is left untouched, no read-before-write.
+    get_client().table("users").upsert({
+        "discord_id": discord_id,
+        "leetcode_username": leetcode_username,
+        "streak_count": 0,
+        "last_solved_date": None,
+        "total_solved": 0
+    }, on_conflict="discord_id", ignore_duplicates=True).execute()
+
+# Bulk upsert keyed by discord_id. Returns [(row, error), ...] for rows that failed.
+def upsert_users(rows: list[dict], ignore_duplicates: bool = False) -> list[tuple[dict, str]]:
+    # PostgREST wants every object in one request to share the same keys.
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    failures = []
+    table = get_client().table("users")
+    for group in groups.values():
+        for i in range(0, len(group), BULK_CHUNK_SIZE):
+            chunk = group[i:i + BULK_CHUNK_SIZE]
+            try:
+                table.upsert(chunk, on_conflict="discord_id", ignore_duplicates=ignore_duplicates).execute()
+            except Exception:
+                # Isolate the bad rows so one of them can't sink the whole chunk.
+                for row in chunk:
+                    try:
+                        table.upsert(row, on_conflict="discord_id", ignore_duplicates=ignore_duplicates).execute()
+                    except Exception as e:
+                        failures.append((row, str(e)))
+    return failures
+
+# Bulk partial update: {discord_id: {column: value}} for rows that already exist.
+# Unknown ids are reported as failures, never inserted. Returns [(row, error), ...].
+def update_users(updates: dict[str, dict]) -> list[tuple[dict, str]]:
+    ids = list(updates)
+    known = set()
+    for i in range(0, len(ids), BULK_CHUNK_SIZE):
+        rows = get_client().table("users").select("discord_id").in_("discord_id", ids[i:i + BULK_CHUNK_SIZE]).execute().data
+        known.update(row["discord_id"] for row in rows)
+    rows = [{"discord_id": discord_id, **changes} for discord_id, changes in updates.items()]
+    # Upserting rows that exist is a bulk update; the unknown ones never reach the table.
+    return [(row, "no such user") for row in rows if row["discord_id"] not in known] + \
+        upsert_users([row for row in rows if row["discord_id"] in known])
+
+
+class UserBatchWriter:
+    """
+    Accumulates per-user column changes and writes them with update_users
+    once `max_rows` are pending or the oldest change is `max_delay` seconds
+    old. Later changes for the same user are merged into the pending row.
+    Unknown users and rows that still fail after the per-row retry end up
+    in `failures`.
+    """
+
+    def __init__(self, max_rows: int = BULK_CHUNK_SIZE, max_delay: float = 5.0):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.pending: dict[str, dict] = {}
+        self.failures: list[tuple[dict, str]] = []
+        self._first_added = 0.0
+        self._timer: asyncio.Task | None = None
+
+    async def add(self, discord_id: str, changes: dict):
+        if not self.pending:
+            self._first_added = time.monotonic()
+        self.pending.setdefault(discord_id, {}).update(changes)
+        if len(self.pending) >= self.max_rows:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(max(0.0, self._first_added + self.max_delay - time.monotonic()))
+        await self.flush()
+
+    async def flush(self) -> list[tuple[dict, str]]:
+        """Write everything pending now; returns this flush's failed rows."""
+        if not self.pending:
+            return []
+        batch, self.pending = self.pending, {}
+        failures = await asyncio.to_thread(update_users, batch)
+        self.failures.extend(failures)
+        return failures
+
+    async def close(self) -> list[tuple[dict, str]]:
+        if self._timer and not self._timer.done():
+            self._timer.cancel()
+        return await self.flush()
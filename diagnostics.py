@@ -0,0 +1,99 @@
+# diagnostics.py
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger("leetcode_bot")
+
+HEARTBEAT_INTERVAL = 0.25   # seconds between event-loop heartbeats
+STALL_THRESHOLD = 0.5       # a heartbeat this late means something is blocking the loop
+MAX_PROFILE_SECONDS = 300
+
+
+class LoopLagWatchdog:
+    """
+    Measures event-loop lag and catches blocking callbacks in the act.
+
+    A heartbeat coroutine stamps the time every HEARTBEAT_INTERVAL and records
+    how late it woke up. A separate thread watches that stamp; when it goes
+    stale for longer than STALL_THRESHOLD the loop thread is stuck, so the
+    thread logs the loop thread's current stack — the offending code (a
+    synchronous json dump, a blocking Supabase call...) is on it.
+    """
+
+    def __init__(self, threshold: float = STALL_THRESHOLD, interval: float = HEARTBEAT_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.last_beat = time.monotonic()
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.stalls = 0
+        self._loop_thread_id: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    async def heartbeat(self):
+        """Run on the event loop being watched (e.g. as a supervised task)."""
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self.last_beat = now
+                self.last_lag = max(0.0, now - expected)
+                self.max_lag = max(self.max_lag, self.last_lag)
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        reported_for = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self.last_beat
+            stalled_for = time.monotonic() - beat
+            if stalled_for < self.threshold or reported_for == beat:
+                continue
+            reported_for = beat  # one report per stall
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+            logger.warning("Event loop blocked for %.2fs; loop thread stack:\n%s", stalled_for, stack)
+
+    def summary(self) -> str:
+        return f"lag now {self.last_lag * 1000:.0f}ms, max {self.max_lag * 1000:.0f}ms, {self.stalls} stalls"
+
+
+class ProfileSession:
+    """cProfile over the event-loop thread for a bounded window."""
+
+    def __init__(self, seconds: float):
+        self.seconds = min(seconds, MAX_PROFILE_SECONDS)
+        self.profiler = cProfile.Profile()
+        self.started_at = 0.0
+        self.running = False
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.profiler.enable()
+        self.running = True
+
+    def stop(self, sort: str = "cumulative", limit: int = 60) -> bytes:
+        """Stop profiling and return a sorted text report."""
+        if self.running:
+            self.profiler.disable()
+            self.running = False
+        out = io.StringIO()
+        out.write(f"Profiled {time.monotonic() - self.started_at:.1f}s, sorted by {sort}\n\n")
+        pstats.Stats(self.profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue().encode()
@@ -1,59 +1,166 @@
 # graphql_queries.py
 
-LEETCODE_STATS_QUERY = """
-query LeetCodeStats($username: String!, $year: Int!, $recentN: Int!) {
-  matchedUser(username: $username) {
-    submitStatsGlobal {
-      acSubmissionNum {
-        difficulty
-        count
-      }
-    }
-    problemsSolvedBeatsStats {
-      difficulty
-      percentage
-    }
-    userCalendar(year: $year) {
-      streak
-      submissionCalendar
-    }
-  }
-  recentAcSubmissionList(username: $username, limit: $recentN) {
-    id
-    title
-    titleSlug
-    timestamp
-  }
-}
-"""
-
-
-QUERY_IF_USER_EXISTS = """
-        query userPublicProfile($username: String!) {
-        matchedUser(username: $username) {
-            username
-        }
-        }
-        """
-
-QUERY_USER_SOLVED = "query getACSubmissions ($username: String!, $limit: Int) { recentAcSubmissionList(username: $username, limit: $limit) { titleSlug timestamp } }"
-QUERY_SINGLE_PROBLEM = "query questionTitle($titleSlug: String!) { question(titleSlug: $titleSlug) { isPaidOnly } }"
-QUERY_DUEL_PROBLEM = """
-        query problemsetQuestionList($categorySlug: String, $limit: Int, $skip: Int, $filters: QuestionListFilterInput) {
-          problemsetQuestionList: questionList(categorySlug: $categorySlug, limit: $limit, skip: $skip, filters: $filters) {
-            questions: data { title titleSlug difficulty }
-          }
-        }"""
-
-
-UPCOMING_CONTESTS_QUERY = """
-query upcomingContests {
-  upcomingContests {
-    title
-    titleSlug
-    startTime
-    duration
-    __typename
-  }
-}
-"""
+from functools import lru_cache
+
+
+# ------------------------- Query builder -------------------------
+class Field:
+    """
+    One field of a selection set: `alias: name(arg: $var, ...) { children }`.
+
+    `name` may be written as "alias: name". Arguments map a GraphQL argument
+    to "$variable: Type". Fields are immutable and hashable so compiled
+    documents can be cached on them.
+    """
+
+    __slots__ = ("name", "alias", "args", "children")
+
+    def __init__(self, name: str, *children, alias: str | None = None, **args: str):
+        if ":" in name:
+            alias, name = (part.strip() for part in name.split(":", 1))
+        self.name = name
+        self.alias = alias
+        self.args = tuple(
+            (arg, *(part.strip() for part in spec.lstrip("$").split(":", 1)))
+            for arg, spec in args.items()
+        )
+        self.children = tuple(c if isinstance(c, Field) else Field(c) for c in children)
+
+    @property
+    def key(self) -> str:
+        """Name this field answers under in the response."""
+        return self.alias or self.name
+
+    def _id(self):
+        return (self.name, self.alias, self.args, self.children)
+
+    def __eq__(self, other):
+        return isinstance(other, Field) and self._id() == other._id()
+
+    def __hash__(self):
+        return hash(self._id())
+
+    def render(self) -> str:
+        out = f"{self.alias}: {self.name}" if self.alias else self.name
+        if self.args:
+            out += "(" + ", ".join(f"{arg}: ${var}" for arg, var, _ in self.args) + ")"
+        if self.children:
+            out += " { " + " ".join(child.render() for child in self.children) + " }"
+        return out
+
+    def variables(self, into: dict[str, str]) -> dict[str, str]:
+        for _, var, type_ in self.args:
+            if into.setdefault(var, type_) != type_:
+                raise ValueError(f"${var} declared as both {into[var]} and {type_}")
+        for child in self.children:
+            child.variables(into)
+        return into
+
+
+@lru_cache(maxsize=256)
+def compile_query(name: str, *roots: Field) -> str:
+    """
+    Merge root fields into one operation, declaring each variable once.
+    Roots must answer under distinct keys (alias repeated roots).
+    """
+    keys = [root.key for root in roots]
+    if len(set(keys)) != len(keys):
+        raise ValueError(f"duplicate response keys in {name}: {keys}")
+    variables: dict[str, str] = {}
+    for root in roots:
+        root.variables(variables)
+    params = "(" + ", ".join(f"${var}: {type_}" for var, type_ in variables.items()) + ")" if variables else ""
+    return f"query {name}{params} {{ " + " ".join(root.render() for root in roots) + " }"
+
+
+# ------------------------- Registry of root fields -------------------------
+def question_list(*fields, alias: str = "problemsetQuestionList", skip: str = "skip", total: bool = False) -> Field:
+    """
+    One page of the problem list with only `fields` per question. Pages
+    sharing a document share $categorySlug/$limit/$filters but each gets its
+    own skip variable.
+    """
+    children = ([Field("total: totalNum")] if total else []) + ([Field("questions: data", *fields)] if fields else [])
+    return Field(
+        "questionList", *children, alias=alias,
+        categorySlug="$categorySlug: String", limit="$limit: Int",
+        skip=f"${skip}: Int", filters="$filters: QuestionListFilterInput",
+    )
+
+def question(*fields, alias: str | None = None, slug: str = "titleSlug") -> Field:
+    return Field("question", *fields, alias=alias, titleSlug=f"${slug}: String!")
+
+def matched_user(*fields, alias: str | None = None, user: str = "username") -> Field:
+    return Field("matchedUser", *fields, alias=alias, username=f"${user}: String!")
+
+def recent_acs(*fields, alias: str | None = None, user: str = "username") -> Field:
+    return Field("recentAcSubmissionList", *fields, alias=alias, username=f"${user}: String!", limit="$limit: Int")
+
+
+AC_FIELDS = ("id", "titleSlug", "timestamp")
+DAILY_FIELDS = ("title", "titleSlug", "difficulty", "isPaidOnly")   # what a daily/duel pick reads
+
+
+LEETCODE_STATS_QUERY = compile_query(
+    "LeetCodeStats",
+    matched_user(
+        Field("submitStatsGlobal", Field("acSubmissionNum", "difficulty", "count")),
+        Field("problemsSolvedBeatsStats", "difficulty", "percentage"),
+        # Lifetime solves per topic tag (public "skills" panel), for !recommend.
+        Field("tagProblemCounts", *(Field(level, "tagSlug", "problemsSolved") for level in ("advanced", "intermediate", "fundamental"))),
+    ),
+)
+
+CALENDAR_QUERY = compile_query(
+    "userCalendar",
+    matched_user(Field("userCalendar", "activeYears", "streak", "submissionCalendar", year="$year: Int")),
+)
+
+QUERY_IF_USER_EXISTS = compile_query("userPublicProfile", matched_user("username"))
+
+QUERY_USER_SOLVED = compile_query("getACSubmissions", recent_acs(*AC_FIELDS))
+QUERY_SINGLE_PROBLEM = compile_query("questionTitle", question("isPaidOnly"))
+
+UPCOMING_CONTESTS_QUERY = compile_query(
+    "upcomingContests", Field("upcomingContests", "title", "titleSlug", "startTime", "duration")
+)
+
+# Paged dump of the whole problem set, used to build the local catalog
+CATALOG_PAGE_QUERY = compile_query(
+    "problemsetQuestionList",
+    question_list(
+        "frontendQuestionId: questionFrontendId", "title", "titleSlug", "difficulty", "isPaidOnly",
+        Field("topicTags", "name", "slug"),
+        total=True,
+    ),
+)
+
+
+# ------------------------- Batched documents -------------------------
+@lru_cache(maxsize=None)
+def batch_ac_query(n: int) -> str:
+    """One document fetching recent ACs for n users via aliases u0..u{n-1}."""
+    return compile_query("batchAcSubmissions", *(recent_acs(*AC_FIELDS, alias=f"u{i}", user=f"u{i}") for i in range(n)))
+
+
+@lru_cache(maxsize=None)
+def batch_user_exists_query(n: int) -> str:
+    """One document checking n usernames via aliases u0..u{n-1}."""
+    return compile_query("usersExist", *(matched_user("username", alias=f"u{i}", user=f"u{i}") for i in range(n)))
+
+
+@lru_cache(maxsize=None)
+def random_pages_query(n: int) -> str:
+    """
+    n one-problem pages (aliases p0..p{n-1}, skips $skip0..) plus the list
+    total in a single request, so a random pick needs no separate count
+    query and no per-problem isPaidOnly lookup.
+    """
+    pages = [question_list(*DAILY_FIELDS, alias=f"p{i}", skip=f"skip{i}", total=i == 0) for i in range(n)]
+    return compile_query("randomProblems", *pages)
+
+
+@lru_cache(maxsize=None)
+def batch_paid_only_query(n: int) -> str:
+    """isPaidOnly for n problems via aliases q0..q{n-1}."""
+    return compile_query("problemsPaidOnly", *(question("isPaidOnly", alias=f"q{i}", slug=f"s{i}") for i in range(n)))
@@ -0,0 +1,59 @@
+# jsoncodec.py
+
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib codec
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def loads(data: bytes | bytearray | memoryview | str):
+    """Parse JSON from bytes or str; bytes are decoded by the parser directly."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumpb(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize to UTF-8 bytes (what HTTP bodies and files want)."""
+    if orjson:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys, ensure_ascii=False).encode()
+
+
+def dumps(obj, indent: bool = False, sort_keys: bool = False) -> str:
+    return dumpb(obj, indent, sort_keys).decode()
+
+
+def load_file(path: str, default=None):
+    """Read a JSON file, or return `default` when it doesn't exist."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_file(path: str, obj, indent: bool = False):
+    # Write-then-rename so a crash mid-write never leaves a truncated file. The temp
+    # name is unique, so concurrent writers (both bots) can't clobber each other's.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumpb(obj, indent))
+        # mkstemp creates 0600; keep the mode the file had (or a plain 0644).
+        os.chmod(tmp, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+async def read_response(resp):
+    """Decode an aiohttp response straight from its body bytes."""
+    return loads(await resp.read())
@@ -0,0 +1,207 @@
+# leetcode_api.py
+
+import asyncio
+import logging
+import random
+import re
+from functools import lru_cache
+import aiohttp
+import clock
+import jsoncodec
+from graphql_queries import batch_user_exists_query, random_pages_query
+from response_cache import cache_key, get_cache
+
+logger = logging.getLogger("leetcode_bot")
+
+GRAPHQL_URL = "https://leetcode.com/graphql"
+CONTEST_RANKING_URL = "https://leetcode.com/contest/api/ranking/{slug}/"
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "Mozilla/5.0",
+}
+REQUESTS_PER_SECOND = 5.0
+BURST = 10
+EXISTS_BATCH_SIZE = 20
+NEGATIVE_TTL = 10 * 60   # seconds a "no such user" answer is trusted
+RANDOM_PAGES = 5         # candidates drawn per random-problem request
+DEFAULT_LIST_TOTAL = 500 # skip range until a real list total has been seen
+
+# How long each kind of answer is served from the shared response cache.
+SUBMISSIONS_TTL = 15          # recent ACs: short, duels need near-live results
+STATS_TTL = 10 * 60           # profile stats / calendars
+CATALOG_TTL = 60 * 60         # problem list pages
+PROBLEM_TTL = 24 * 60 * 60    # single-problem metadata
+
+
+class LeetCodeError(Exception):
+    """LeetCode answered with a non-200 status or a body that isn't JSON."""
+
+
+class RateLimiter:
+    """Token bucket shared by every request this process sends to LeetCode."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = clock.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0          # acquisitions that had to wait for a token
+        self.waited = 0.0       # seconds spent waiting in total
+
+    async def acquire(self):
+        async with self._lock:
+            now = clock.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                self.waits += 1
+                self.waited += delay
+                await clock.sleep(delay)
+                self.tokens = 1.0
+                self.updated = clock.monotonic()
+            self.tokens -= 1
+
+
+limiter = RateLimiter(REQUESTS_PER_SECOND, BURST)
+_session: aiohttp.ClientSession | None = None
+_missing_users: dict[str, float] = {}   # lowercased username → expiry
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Process-wide session, so one-off commands don't each open their own."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession()
+    return _session
+
+
+def set_session(session):
+    """Install the session get_session() hands out (the simulator's LeetCode stand-in)."""
+    global _session
+    _session = session
+
+
+async def close_session():
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+@lru_cache(maxsize=256)
+def payload_prefix(query: str) -> bytes:
+    """`{"query": ..., "variables": ` serialized once per document; only the variables vary per call."""
+    return jsoncodec.dumpb({"query": query})[:-1] + b', "variables": '
+
+
+@lru_cache(maxsize=256)
+def operation_name(query: str) -> str:
+    match = re.match(r"\s*(?:query|mutation)\s+(\w+)", query)
+    return match.group(1) if match else "anonymous"
+
+
+async def graphql(session: aiohttp.ClientSession, query: str, variables: dict | None = None, ttl: float = 0) -> dict:
+    """
+    POST one GraphQL document and return the decoded response body.
+    With a `ttl`, the shared cross-process response cache is read first and
+    successful answers are stored in it.
+    """
+    key = cache_key(query, variables) if ttl else None
+    if key:
+        cached = get_cache().get(key)
+        if cached is not None:
+            logger.debug("GraphQL %s served from cache", operation_name(query),
+                         extra={"operation": operation_name(query), "cached": True})
+            return jsoncodec.loads(cached)
+
+    payload = payload_prefix(query) + jsoncodec.dumpb(variables or {}) + b"}"
+    await limiter.acquire()
+    started = clock.monotonic()
+    async with session.post(GRAPHQL_URL, data=payload, headers=DEFAULT_HEADERS) as resp:
+        body = await resp.read()
+        latency_ms = round((clock.monotonic() - started) * 1000, 1)
+        logger.debug("GraphQL %s -> HTTP %d in %.0fms", operation_name(query), resp.status, latency_ms,
+                     extra={"operation": operation_name(query), "status": resp.status, "latency_ms": latency_ms, "bytes": len(body)})
+        if resp.status != 200:
+            raise LeetCodeError(f"HTTP {resp.status}: {body[:200]!r}")
+    try:
+        result = jsoncodec.loads(body)
+    except ValueError as e:
+        raise LeetCodeError(f"Non-JSON response: {body[:300]!r}") from e
+    if key and not result.get("errors"):
+        get_cache().set(key, body, ttl)
+    return result
+
+
+def cache_result(query: str, variables: dict | None, data: dict, ttl: float):
+    """Store `{"data": data}` as if it were the answer to (query, variables)."""
+    get_cache().set(cache_key(query, variables), jsoncodec.dumpb({"data": data}), ttl)
+
+
+def cached_result(query: str, variables: dict | None) -> dict | None:
+    body = get_cache().get(cache_key(query, variables))
+    return jsoncodec.loads(body) if body is not None else None
+
+
+async def get_json(session: aiohttp.ClientSession, url: str, params: dict | None = None):
+    """GET a LeetCode REST endpoint and decode the body straight from bytes."""
+    await limiter.acquire()
+    async with session.get(url, params=params, headers=DEFAULT_HEADERS) as resp:
+        body = await resp.read()
+        if resp.status != 200:
+            raise LeetCodeError(f"HTTP {resp.status}: {body[:200]!r}")
+    try:
+        return jsoncodec.loads(body)
+    except ValueError as e:
+        raise LeetCodeError(f"Non-JSON response: {body[:300]!r}") from e
+
+
+async def users_exist(session: aiohttp.ClientSession, usernames) -> dict[str, str | None]:
+    """
+    Map each username to its canonical LeetCode spelling, or None if the
+    account doesn't exist. Checks go out EXISTS_BATCH_SIZE names per aliased
+    query, batches run concurrently under the shared rate limit, and recent
+    misses are answered from a short-lived negative cache.
+    """
+    now = clock.monotonic()
+    result: dict[str, str | None] = {}
+    pending = []
+    for name in dict.fromkeys(usernames):
+        if _missing_users.get(name.lower(), 0) > now:
+            result[name] = None
+        else:
+            pending.append(name)
+
+    async def check(batch):
+        data = (await graphql(session, batch_user_exists_query(len(batch)), {f"u{i}": n for i, n in enumerate(batch)})).get("data") or {}
+        for i, name in enumerate(batch):
+            user = data.get(f"u{i}")
+            result[name] = user["username"] if user else None
+            if not user:
+                _missing_users[name.lower()] = clock.monotonic() + NEGATIVE_TTL
+
+    await asyncio.gather(*(check(pending[i:i + EXISTS_BATCH_SIZE]) for i in range(0, len(pending), EXISTS_BATCH_SIZE)))
+    return result
+
+
+_list_totals: dict[str, int] = {}   # difficulty → problem-list total last seen
+
+async def random_problems(session: aiohttp.ClientSession, difficulty: str, count: int = RANDOM_PAGES) -> list[dict]:
+    """
+    Up to `count` random free problems of `difficulty` from one request.
+    The list total rides along with the pages, so skips are drawn from the
+    last total seen; a first guess that overshoots just yields fewer picks.
+    """
+    total = _list_totals.get(difficulty, DEFAULT_LIST_TOTAL)
+    skips = random.sample(range(total), min(count, total))
+    variables = {"categorySlug": "", "limit": 1, "filters": {"difficulty": difficulty}}
+    variables.update({f"skip{i}": skip for i, skip in enumerate(skips)})
+    data = (await graphql(session, random_pages_query(len(skips)), variables)).get("data") or {}
+    if data.get("p0"):
+        _list_totals[difficulty] = data["p0"]["total"]
+    return [
+        q
+        for i in range(len(skips))
+        for q in (data.get(f"p{i}") or {}).get("questions") or []
+        if not q["isPaidOnly"]
+    ]
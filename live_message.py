@@ -0,0 +1,134 @@
+# live_message.py
+
+import asyncio
+import logging
+import re
+import discord
+import clock
+
+logger = logging.getLogger("leetcode_bot")
+
+DISCORD_LIMIT = 2000
+
+
+def split_content(text: str, limit: int = DISCORD_LIMIT) -> list[str]:
+    """
+    Split text into message-sized chunks. Lines are kept whole where they
+    fit; a line longer than a message (e.g. a long list of names) is packed
+    word by word so it continues straight into the next chunk.
+    """
+    chunks, current = [], ""
+
+    def push(piece):
+        nonlocal current
+        if len(current) + len(piece) > limit:
+            chunks.append(current)
+            current = ""
+        current += piece
+
+    for line in text.splitlines(keepends=True):
+        if len(current) + len(line) <= limit:
+            current += line
+        elif len(line) <= limit:
+            push(line)
+        else:
+            for word in re.findall(r"\S+\s*|\s+", line):
+                while len(word) > limit:
+                    push(word[:limit])
+                    word = word[limit:]
+                push(word)
+    if current or not chunks:
+        chunks.append(current)
+    return [chunk.rstrip() or "\u200b" for chunk in chunks]
+
+
+class LiveMessage:
+    """
+    A status message that is kept up to date in place.
+
+    `update()` only records the latest content; edits are coalesced and sent
+    at most once per `min_interval` seconds, unchanged chunks are never
+    re-sent, and content over Discord's limit spills into extra messages that
+    this object owns (and deletes again when the content shrinks).
+    """
+
+    def __init__(self, channel: discord.abc.Messageable, min_interval: float = 5.0, limit: int = DISCORD_LIMIT):
+        self.channel = channel
+        self.min_interval = min_interval
+        self.limit = limit
+        self.messages: list[discord.Message] = []
+        self._rendered: list[str] = []
+        self._pending: str | None = None
+        self._last_flush = 0.0
+        self._flusher: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.edits = 0
+        self.skipped = 0
+
+    @property
+    def content(self) -> str:
+        return "\n".join(self._rendered)
+
+    def update(self, content: str):
+        """Queue new content; it is written by a throttled background flush."""
+        self._pending = content
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        delay = self._last_flush + self.min_interval - clock.monotonic()
+        if delay > 0:
+            await clock.sleep(delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("Failed to update live message: %s", e)
+
+    async def flush(self):
+        """Write pending content right away."""
+        async with self._lock:
+            content, self._pending = self._pending, None
+            if content is None:
+                return
+            try:
+                await self._render(split_content(content, self.limit))
+            finally:
+                self._last_flush = clock.monotonic()
+
+    async def _render(self, chunks: list[str]):
+        for i, chunk in enumerate(chunks):
+            if i < len(self.messages):
+                if self._rendered[i] == chunk:
+                    self.skipped += 1
+                    continue
+                await self.messages[i].edit(content=chunk)
+                self._rendered[i] = chunk
+                self.edits += 1
+            else:
+                self.messages.append(await self.channel.send(chunk))
+                self._rendered.append(chunk)
+        while len(self.messages) > len(chunks):
+            extra = self.messages.pop()
+            self._rendered.pop()
+            try:
+                await extra.delete()
+            except discord.HTTPException:
+                pass
+
+    async def close(self, final_content: str | None = None):
+        """Stop pending flushes, optionally writing one last state."""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+        if final_content is not None:
+            self._pending = final_content
+            await self.flush()
+
+    async def delete(self):
+        await self.close()
+        for message in self.messages:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                pass
+        self.messages.clear()
+        self._rendered.clear()
@@ -0,0 +1,127 @@
+# log_pipeline.py
+
+import atexit
+import datetime as dt
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+import jsoncodec
+
+LOGGER_NAME = "leetcode_bot"
+QUEUE_SIZE = 10_000
+MAX_BYTES = 10 * 1024 * 1024
+BACKUPS = 5
+DROP_REPORT_INTERVAL = 60.0   # seconds between "dropped N records" warnings
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, and any
+    structured fields passed via `extra=` (operation, user, guild,
+    latency_ms, ...), so logs can be filtered with jq instead of grep.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": dt.datetime.fromtimestamp(record.created, dt.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return jsoncodec.dumps(entry)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without blocking. The message is
+    rendered here (arguments may not be safe to read later), the traceback
+    is rendered once, and a full queue drops the record rather than stall
+    the event loop.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+        self.reported = 0   # drops already announced in the log itself
+        self._reported_at = 0.0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.dropped > self.reported and time.monotonic() - self._reported_at >= DROP_REPORT_INTERVAL:
+                # Say in the log itself what was lost (at most once a minute).
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": LOGGER_NAME, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"Log queue was full: dropped {self.dropped - self.reported} records",
+                    "operation": "log_pipeline", "dropped_total": self.dropped,
+                }))
+                self.reported = self.dropped
+                self._reported_at = time.monotonic()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+_handler: DroppingQueueHandler | None = None
+
+def dropped_records() -> int:
+    """Records lost to a full queue since logging was configured (0 if it wasn't)."""
+    return _handler.dropped if _handler else 0
+
+def configure_logging(path: str, level: int = logging.DEBUG, when: str | None = None,
+                      max_bytes: int = MAX_BYTES, backups: int = BACKUPS) -> logging.Logger:
+    """
+    Route the bot logger through a queue to a background writer thread.
+
+    The thread writes JSON lines to `path`, rotating by size (`max_bytes`)
+    or, with `when` (e.g. "midnight"), by time, and echoes INFO and above to
+    stderr. Each process must use its own `path`: rotation is not safe
+    across processes. Called once from each entry point, not at import.
+    """
+    global _listener, _handler
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    if when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backups, encoding="utf-8")
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(logging.INFO)
+    console.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    records: queue.Queue = queue.Queue(QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(records, file_handler, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)   # drains whatever is still queued
+
+    logger.setLevel(level)
+    _handler = DroppingQueueHandler(records)
+    logger.addHandler(_handler)
+    logger.propagate = False
+    return logger
@@ -1,94 +1,58 @@
+import time
+_process_start = time.perf_counter()
+
 import discord
 from discord import File
-from discord.ext import commands, tasks
-import aiohttp, random, os, asyncio, json, logging
+import aiohttp, os, asyncio, logging
 import datetime as dt
 from zoneinfo import ZoneInfo  # Use Python 3.9+ zoneinfo
-
-# ------------------------- Debug Logging to File -------------------------
+from startup import BootTimer
+from log_pipeline import configure_logging
+import clock
+import jsoncodec
+from leetcode_api import graphql, random_problems, users_exist, get_session, LeetCodeError, PROBLEM_TTL
+from submission_history import get_history
+from catalog import get_catalog
+from problem_sampler import get_sampler
+from live_message import LiveMessage
+from records import MemberState, solve_matrix
+from supervisor import SupervisedBot
+from daily_queue import DailyQueue
+from participants import ParticipantIndex
+from results_archive import ResultsArchive
+from graphql_queries import batch_paid_only_query
+
+boot = BootTimer("main", started_at=_process_start)
+boot.record("imports", time.perf_counter() - _process_start)
+
+# ------------------------- Logging -------------------------
 logger = logging.getLogger("leetcode_bot")
-logger.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler("leetcode_bot_log.log")
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+LOG_FILE = "leetcode_bot_log.log"
 
 # ------------------------- Intents and Bot Setup -------------------------
 intents = discord.Intents.default()
 intents.message_content = True
 intents.reactions = True
-intents.members = True  # Required to fetch role members!
-bot = commands.Bot(command_prefix="!", intents=intents)
+intents.members = False    # participants are resolved one by one, see participants.py
+intents.moderation = True  # audit-log role changes keep the participant index current
+bot = SupervisedBot(
+    command_prefix="!", intents=intents, task_limits={"pollers": 2},
+    chunk_guilds_at_startup=False, member_cache_flags=discord.MemberCacheFlags.none(),
+)
 
 CHALLENGE_CHANNEL_ID = 1348527848843120683
 ROLE_ID = 1348563397230202961
 
-# ------------------------- GraphQL Queries -------------------------
-query_total = """
-query {
-  problemsetQuestionList: questionList(
-    categorySlug: ""
-    limit: 1
-    skip: 0
-    filters: {difficulty: EASY}
-  ) {
-    total: totalNum
-  }
-}
-"""
-
-query_problem = """
-query problemsetQuestionList($categorySlug: String, $limit: Int, $skip: Int, $filters: QuestionListFilterInput) {
-  problemsetQuestionList: questionList(
-    categorySlug: $categorySlug
-    limit: $limit
-    skip: $skip
-    filters: $filters
-  ) {
-    total: totalNum
-    questions: data {
-      title
-      titleSlug
-      difficulty
-      topicTags {
-        name
-      }
-    }
-  }
-}
-"""
-
-# GraphQL query for accepted submissions
-QUERY_ACCEPTED = """
-#graphql
-query getACSubmissions ($username: String!, $limit: Int) {
-    recentAcSubmissionList(username: $username, limit: $limit) {
-        title
-        titleSlug
-        timestamp
-        statusDisplay
-        lang
-    }
-}
-"""
-
 # ------------------------- Global Data Files -------------------------
 USERS_FILE = "users.json"       # Maps Discord user IDs to their LeetCode username and Discord name.
 BALANCES_FILE = "balances.json"   # Maps Discord user IDs to their cumulative balance.
 
-# Load or initialize registered users
-if os.path.exists(USERS_FILE):
-    with open(USERS_FILE, "r") as f:
-        bot.users_data = json.load(f)
-else:
-    bot.users_data = {}
-
-# Load or initialize balances
-if os.path.exists(BALANCES_FILE):
-    with open(BALANCES_FILE, "r") as f:
-        bot.balances = json.load(f)
-else:
-    bot.balances = {}
+# Populated concurrently in setup_hook, before any command can run.
+bot.users_data  = {}
+bot.balances    = {}
+bot.daily_queue = None   # DailyQueue of pre-validated problem sets
+bot.participants = None  # ParticipantIndex of registered role holders
+bot.results_archive = None  # ResultsArchive of every day's outcome
 
 # ------------------------- Challenge Data -------------------------
 # Track two daily challenges
@@ -97,9 +61,7 @@ bot.current_challenge_slugs = []     # [slug1, slug2]
 
 bot.challenge_post_times   = []     # [datetime1, datetime2]
 
-bot.status_message         = None   # Combined status message
-
-bot.status_updater         = None   # Task handle for update_status_loop
+bot.status_message         = None   # LiveMessage holding the combined status
 
 
 
@@ -113,111 +75,168 @@ bot.explanations         = {}  # {(user_id, idx): {"type":..., "content"/"file_p
 async def fetch_problem():
     """Fetch a random unused Easy problem."""
     logger.debug("Starting fetch_problem()")
-    try:
-        with open("sent_problems.json", "r") as f:
-            used_slugs = json.load(f)
-    except FileNotFoundError:
-        used_slugs = []
-
-    query_single_problem = """
-    query questionTitle($titleSlug: String!) {
-      question(titleSlug: $titleSlug) {
-        title
-        titleSlug
-        difficulty
-        isPaidOnly
-        topicTags {
-          name
-        }
-      }
-    }
-    """
-
-    async with aiohttp.ClientSession() as session:
-        logger.debug("Fetching total number of problems from LeetCode API")
-        async with session.post("https://leetcode.com/graphql", json={"query": query_total}) as resp:
-            data = await resp.json()
-
-        if "data" not in data or "problemsetQuestionList" not in data["data"]:
-            logger.error("Unexpected response format from LeetCode API: %s", data)
-            return None
-
-        total = data["data"]["problemsetQuestionList"]["total"]
-
-        
-        for _ in range(10):
-
-            skip = random.randrange(total)
-
-            vars = {"categorySlug": "", "skip": skip, "limit": 1, "filters": {"difficulty": "EASY"}}
-
-            async with session.post("https://leetcode.com/graphql", json={"query": query_problem, "variables": vars}) as resp:
-                result = await resp.json()
-            qs = result["data"]["problemsetQuestionList"]["questions"]
-            if not qs:
-                await asyncio.sleep(0.5)
-                continue
-
-            qdata = qs[0]
-            slug  = qdata["titleSlug"]
-            # ensure not premium
-            async with session.post("https://leetcode.com/graphql", json={"query": query_single_problem, "variables": {"titleSlug": slug}}) as resp:
-
-                full = await resp.json()
-
-            if full["data"]["question"]["isPaidOnly"]:
-
-                await asyncio.sleep(0.5)
-                continue
+    used_slugs = jsoncodec.load_file("sent_problems.json", [])
 
+    session = get_session()
+    for _ in range(3):
+        # One request returns several free candidates (and the list total).
+        for qdata in await random_problems(session, "EASY"):
+            slug = qdata["titleSlug"]
             if slug not in used_slugs:
                 used_slugs.append(slug)
-                with open("sent_problems.json", "w") as f:
-                    json.dump(used_slugs, f)
+                jsoncodec.dump_file("sent_problems.json", used_slugs)
                 logger.info("Fetched new problem: %s (%s)", qdata["title"], slug)
                 return qdata
-            else:
-                logger.debug("Problem %s already used. Trying again.", slug)
-            await asyncio.sleep(0.5)
+            logger.debug("Problem %s already used. Trying again.", slug)
+        await clock.sleep(0.5)
+    return None
+
+def daily_guild_id() -> int:
+    """Guild whose sampler weights drive the daily picks: the challenge channel's."""
+    channel = bot.get_channel(CHALLENGE_CHANNEL_ID)
+    return channel.guild.id if channel else 0
+
+async def pick_daily_problems(count: int = 2, for_date: dt.date | None = None):
+    """
+    Pick a day's problems from the local catalog using the guild's sampler
+    weights. Nothing is reserved here: callers call reserve_problems once
+    the set is actually going to be used.
+    """
+    used_slugs = jsoncodec.load_file("sent_problems.json", [])
+    if bot.daily_queue is not None:
+        # Queued sets are reserved when pushed; also skipping them here covers
+        # a set that was pushed but never made it into sent_problems.json.
+        sent = set(used_slugs)
+        used_slugs += [slug for slug in bot.daily_queue.reserved_slugs() if slug not in sent]
+
+    guild_id = daily_guild_id()
+    await get_catalog().ensure_loaded()
+
+    # Seeded by guild and date, so a re-run for the same day picks the same set.
+    seed = f"{guild_id}:{(for_date or clock.now(IST).date()).isoformat()}"
+    qs = get_sampler().pick(guild_id, used_slugs, count, seed=seed)
+    if len(qs) < count:
+        logger.error("Sampler could not find %d unused problems", count)
         return None
-    
-async def query_user_submissions(leetcode_username: str):
-    """Get recent AC submissions for a user."""
+
+    logger.info("Picked daily problems: %s", ", ".join(q["titleSlug"] for q in qs))
+    return qs
+
+def reserve_problems(qs):
+    """Record problems in sent_problems.json so no later pick repeats them."""
+    used_slugs = jsoncodec.load_file("sent_problems.json", [])
+    used_slugs.extend(q["titleSlug"] for q in qs if q["titleSlug"] not in used_slugs)
+    jsoncodec.dump_file("sent_problems.json", used_slugs)
+
+async def validate_problems(session: aiohttp.ClientSession, qs) -> bool:
+    """Confirm with LeetCode that every problem still exists and is free."""
+    if not qs:
+        return True
+    variables = {f"s{i}": q["titleSlug"] for i, q in enumerate(qs)}
+    full = await graphql(session, batch_paid_only_query(len(qs)), variables, ttl=PROBLEM_TTL)
+    data = full.get("data") or {}
+    for i, q in enumerate(qs):
+        question = data.get(f"q{i}")
+        if not question or question["isPaidOnly"]:
+            logger.warning("Dropping %s from the daily queue: premium or missing", q["titleSlug"])
+            return False
+    return True
+
+def next_post_date() -> dt.date:
+    """Date of the next scheduled daily post."""
+    now = clock.now(IST)
+    if now.timetz() >= daily_time:
+        return now.date() + dt.timedelta(days=1)
+    return now.date()
+
+async def refill_daily_queue():
+    """Keep several days of validated problem sets ready ahead of posting (hourly)."""
+    queue = bot.daily_queue
+    attempts = queue.needs() + 3
+    session = get_session()
+    while queue.needs() and attempts:
+        attempts -= 1
+        for_date = next_post_date() + dt.timedelta(days=len(queue))
+        try:
+            qs = await pick_daily_problems(2, for_date)
+            if qs and await validate_problems(session, qs):
+                queue.push(qs, for_date.isoformat())
+                reserve_problems(qs)
+                logger.info("Queued daily problems for %s", for_date)
+        except Exception as e:
+            # LeetCode being down now is fine; the next hourly pass retries.
+            logger.error("Daily queue refill failed: %s", e)
+            return
+
+async def fetch_daily_pair():
+    """Today's two problems: pre-staged queue first, then sampler, then live random fetch."""
+    staged = bot.daily_queue.pop() if bot.daily_queue is not None else None
+    if staged:
+        return staged
+    qs = await pick_daily_problems(2)
+    if qs:
+        reserve_problems(qs)
+        return qs
+    q1 = await fetch_problem()
+    q2 = await fetch_problem()
+    return [q1, q2] if q1 and q2 else None
+
+async def sync_user_submissions(session: aiohttp.ClientSession, leetcode_username: str) -> bool:
+    """Pull a user's new AC submissions into the local history store."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://leetcode.com/graphql",
-                                    json={"query": QUERY_ACCEPTED, "variables": {"username": leetcode_username, "limit": 20}}) as resp:
-                if resp.content_type != 'application/json':
-                    text = await resp.text()
-                    logger.error(f"Non-JSON response for {leetcode_username}: {text[:300]}")
-                    return []
-                data = await resp.json()
-        return data.get("data", {}).get("recentAcSubmissionList", [])
+        await get_history().sync(session, leetcode_username)
+        return True
     except Exception as e:
-        logger.error(f"Failed to fetch submissions for {leetcode_username}: {e}")
-        return []
+        logger.error("Failed to fetch submissions for %s: %s", leetcode_username, e,
+                     extra={"operation": "sync_submissions", "user": leetcode_username})
+        return False
+
+async def participant_states(guild) -> list[MemberState]:
+    """Registered, non-bot role members as compact per-challenge state records."""
+    problems = len(bot.current_challenge_slugs)
+    return [
+        MemberState(str(m.id), bot.users_data[str(m.id)]["leetcode_username"], m, problems)
+        for m in await bot.participants.members(guild, bot.users_data)
+    ]
+
+async def refresh_solve_matrix(states: list[MemberState], pause: float = 0.3) -> list[MemberState]:
+    """Sync everyone's submissions, then fill the members × problems matrix in one pass."""
+    session = get_session()
+    for state in states:
+        await sync_user_submissions(session, state.username)
+        await clock.sleep(pause)
+    thresholds = [int(t.timestamp()) for t in bot.challenge_post_times]
+    latest = get_history().latest_acs((state.username for state in states), bot.current_challenge_slugs)
+    return solve_matrix(states, bot.current_challenge_slugs, thresholds, latest)
 
 
 # ------------------------- Commands -------------------------
 @bot.command()
 async def register(ctx, leetcode_username: str):
     """Register your LeetCode username for challenge tracking."""
+    try:
+        canonical = (await users_exist(get_session(), [leetcode_username]))[leetcode_username]
+    except LeetCodeError as e:
+        logger.error("Could not validate %s: %s", leetcode_username, e,
+                     extra={"operation": "register", "user": leetcode_username})
+        return await ctx.send("⚠️ Couldn't reach LeetCode to check that username. Try again later.")
+    if not canonical:
+        return await ctx.send(f"❌ `{leetcode_username}` doesn't exist on LeetCode.")
+    leetcode_username = canonical
+
     user_id = str(ctx.author.id)
     bot.users_data[user_id] = {"discord_username": ctx.author.name, "leetcode_username": leetcode_username}
-    with open(USERS_FILE, "w") as f:
-        json.dump(bot.users_data, f)
+    jsoncodec.dump_file(USERS_FILE, bot.users_data)
+    if ctx.guild:
+        bot.participants.note_member(ctx.author)
     if user_id not in bot.balances:
         bot.balances[user_id] = 0
-    logger.info("User %s registered with LeetCode username: %s", ctx.author.name, leetcode_username)
+    logger.info("User %s registered with LeetCode username: %s", ctx.author.name, leetcode_username,
+                extra={"operation": "register", "user": user_id, "guild": ctx.guild.id if ctx.guild else None})
     await ctx.send(f"Registered {ctx.author.name} with LeetCode username: {leetcode_username}")
 
-@bot.command()
-async def monthly(ctx):
-    """Computes fair cost-sharing settlements between all users."""
-    if not bot.balances:
-        await ctx.send("No balance data available.")
-        return
-
+def monthly_settlement():
+    """Each user's net position against the fair share, and the payments that settle them."""
     user_ids = list(bot.balances.keys())
     n = len(user_ids)
     total = sum(bot.balances.values())
@@ -253,7 +272,16 @@ async def monthly(ctx):
             i += 1
         if abs(creditor_amt) < 0.01:
             j += 1
+    return user_ids, net_positions, settlements
+
+@bot.command()
+async def monthly(ctx):
+    """Computes fair cost-sharing settlements between all users."""
+    if not bot.balances:
+        await ctx.send("No balance data available.")
+        return
 
+    user_ids, net_positions, settlements = monthly_settlement()
     await ctx.send("📊 **Net Positions (after fair share calculation)**")
     summary = []
     for uid in user_ids:
@@ -273,8 +301,7 @@ async def monthly(ctx):
 
     for uid in user_ids:
         bot.balances[uid] = 0
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
 
 @bot.command()
 async def leaderboard(ctx):
@@ -313,14 +340,34 @@ async def sendtoday(ctx):
     special = 815555652780294175
     if ctx.author.id != special:
         return await ctx.send("❌ Not authorized.")
-    q1 = await fetch_problem()
-    q2 = await fetch_problem()
-    if q1 and q2:
-        await post_two_challenges([q1, q2])
+    qs = await fetch_daily_pair()
+    if qs:
+        await post_two_challenges(qs)
         await ctx.send("✅ Posted today's two challenges.")
     else:
         await ctx.send("⚠️ Could not fetch two problems.")
 
+@bot.command()
+async def dailyweights(ctx, kind: str = None, name: str = None, weight: float = None):
+    """Admin-only: tune the daily sampler, e.g. `!dailyweights difficulty medium 0.5` or `!dailyweights tags dynamic-programming 2`."""
+    special_user_id = 815555652780294175
+    sampler = get_sampler()
+    # Weights live under the challenge channel's guild, which is what the daily picker reads.
+    guild_id = daily_guild_id()
+    if kind is None:
+        cfg = sampler.config_for(guild_id)
+        return await ctx.send(f"```{jsoncodec.dumps(cfg, indent=True)}```")
+    if ctx.author.id != special_user_id:
+        return await ctx.send("❌ You are not authorized to use this command.")
+    if kind not in ("difficulty", "tags") or name is None or weight is None or weight < 0:
+        return await ctx.send("Usage: `!dailyweights <difficulty|tags> <name> <weight ≥ 0>`")
+
+    try:
+        sampler.set_weight(guild_id, kind, name, weight)
+    except ValueError as e:
+        return await ctx.send(f"❌ {e}.")
+    await ctx.send(f"✅ Daily {kind} weight for `{name}` set to {weight}.")
+
 @bot.command()
 async def set_balance(ctx, target: discord.Member, amount: int):
     """Admin-only command to set a specific balance."""
@@ -331,8 +378,7 @@ async def set_balance(ctx, target: discord.Member, amount: int):
 
     user_id = str(target.id)
     bot.balances[user_id] = amount
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
     await ctx.send(f"✅ Balance for {target.display_name} set to Rs {amount}.")
 
 @bot.command()
@@ -345,8 +391,7 @@ async def admin_reset(ctx, target: discord.Member):
 
     user_id = str(target.id)
     bot.balances[user_id] = 0
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
     await ctx.send(f"✅ Balance for {target.display_name} has been reset to Rs 0.")
 
 @bot.command()
@@ -359,8 +404,7 @@ async def badexplanation(ctx, target: discord.Member):
 
     user_id = str(target.id)
     bot.balances[user_id] = bot.balances.get(user_id, 0) - 100
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
     await ctx.send(f"❌ {target.display_name}'s explanation has been marked as bad. Rs 100 has been deducted from their balance.")
 
 @bot.command()
@@ -374,8 +418,7 @@ async def add100(ctx):
     for user_id in bot.balances:
         bot.balances[user_id] += 100
 
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
 
     await ctx.send("Rs 100 has been added to all users' balances.")
 
@@ -390,25 +433,73 @@ async def remove100(ctx):
     for user_id in bot.balances:
         bot.balances[user_id] -= 100
 
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
 
     await ctx.send("Rs 100 has been removed from all users' balances.")
 
+@bot.command()
+async def history(ctx, member: discord.Member = None):
+    """
+    Usage: !history [@User]
+    Daily-challenge record from the results archive: solve rate, best and
+    current streak, penalties, plus the server's hardest problems so far.
+    """
+    member = member or ctx.author
+    archive = bot.results_archive
+    summary, hardest = await asyncio.gather(
+        asyncio.to_thread(archive.user_summary, str(member.id)),
+        asyncio.to_thread(archive.hardest),
+    )
+    embed = discord.Embed(title=f"📜 Challenge History for {member.display_name}", color=discord.Color.purple())
+    if summary:
+        rate = 100 * summary["solved"] / summary["problems"]
+        embed.add_field(
+            name="Record",
+            value=(
+                f"Solved `{summary['solved']}/{summary['problems']}` ({rate:.0f}%) over `{summary['days']}` days "
+                f"since {summary['first_day'].isoformat()}\n"
+                f"Explanations: `{summary['explained']}` · Penalties: `Rs {summary['penalty']}`\n"
+                f"Best streak: `{summary['best_streak']}` days · Current: `{summary['current_streak']}`"
+            ),
+            inline=False,
+        )
+    else:
+        embed.description = "No archived results yet."
+    if hardest:
+        embed.add_field(
+            name="Hardest Problems",
+            value="\n".join(f"`{slug}` — {ok}/{n} solved" for slug, ok, n in hardest),
+            inline=False,
+        )
+    await ctx.send(embed=embed)
+
 
 # ------------------------- Scheduling Times (using ZoneInfo for IST) -------------------------
 IST = ZoneInfo("Asia/Kolkata")
 daily_time = dt.time(hour=0, minute=35, tzinfo=IST)         # Daily challenge posting at 00:05 IST,
 results_time = dt.time(hour=0, minute=0, tzinfo=IST)        # Results & explanation deadline at 12:00 IST
 
+STATUS_INTERVAL = 300   # seconds between status passes while the window is open
+
 # ------------------------- Challenge and Results Scheduling -------------------------
+def start_schedules():
+    """Daily post, results and hourly queue refill, driven by the installed clock."""
+    schedules = {
+        "daily-challenge": lambda: clock.daily(daily_time, send_daily_challenge),
+        "daily-results": lambda: clock.daily(results_time, compile_and_post_results),
+        "daily-queue": lambda: clock.every(60 * 60, refill_daily_queue),
+    }
+    for name, factory in schedules.items():
+        if name not in bot.supervisor.tasks:
+            bot.supervisor.spawn(name, factory, group="schedules", restart=True)
+
 
 async def post_two_challenges(qs):
     """Post two embeds and set up the combined status + updater."""
     channel = bot.get_channel(CHALLENGE_CHANNEL_ID)
     guild   = channel.guild
     role    = guild.get_role(ROLE_ID)
-    now     = dt.datetime.now(IST)
+    now     = clock.now(IST)
 
     # Reset
     bot.current_challenge_slugs.clear()
@@ -423,7 +514,7 @@ async def post_two_challenges(qs):
     for i, q in enumerate(qs, start=1):
         title, slug = q["title"], q["titleSlug"]
         diff = q["difficulty"]
-        color = discord.Color.green() if diff=="Easy" else discord.Color.yellow()
+        color = {"Easy": discord.Color.green(), "Hard": discord.Color.red()}.get(diff, discord.Color.yellow())
         url = f"https://leetcode.com/problems/{slug}/"
 
         embed = discord.Embed(title=f"Problem {i}: {title}", url=url, color=color)
@@ -439,110 +530,86 @@ async def post_two_challenges(qs):
         "Problem 1 → Solved: 0 | Pending: (calculating...)\n"
         "Problem 2 → Solved: 0 | Pending: (calculating...)"
     )
-    bot.status_message = await channel.send(status_text)
+    bot.status_message = LiveMessage(channel, min_interval=30)
+    bot.status_message.update(status_text)
+    await bot.status_message.flush()
 
-    # Start live updater
-    if bot.status_updater:
-        bot.status_updater.cancel()
-    bot.status_updater = bot.loop.create_task(update_status_loop())
+    # Start (or replace) the live updater; it is restarted if it crashes.
+    bot.supervisor.spawn("status-updater", update_status_loop, group="pollers", restart=True, replace=True)
 
-@tasks.loop(time=daily_time)
 async def send_daily_challenge():
-    q1 = await fetch_problem()
-    q2 = await fetch_problem()
-    if q1 and q2:
-        await post_two_challenges([q1, q2])
+    qs = await fetch_daily_pair()
+    if qs:
+        await post_two_challenges(qs)
     else:
         logger.error("Could not fetch two challenges today.")
 
 async def update_status_loop():
     channel = bot.get_channel(CHALLENGE_CHANNEL_ID)
     guild   = channel.guild
-    role    = guild.get_role(ROLE_ID)
-    end     = dt.datetime.now(IST).replace(hour=results_time.hour, minute=results_time.minute, second=0)
-    if dt.datetime.now(IST) >= end:
-        end += dt.timedelta(days=1)
+    end     = clock.next_run(results_time, clock.now(IST))
 
-    while dt.datetime.now(IST) < end:
+    while clock.now(IST) < end:
         counts   = [0, 0]
         pendings = [[], []]
 
-        for member in role.members:
-            if member.bot:
-                continue
-            uid = str(member.id)
-            if uid not in bot.users_data:
-                continue
-
-            subs = await query_user_submissions(bot.users_data[uid]["leetcode_username"])
-            await asyncio.sleep(0.3)
-
+        for state in await refresh_solve_matrix(await participant_states(guild)):
             for idx, slug in enumerate(bot.current_challenge_slugs):
-                solved = False
-                for sub in subs:
-                    if sub["titleSlug"] == slug:
-                        t = dt.datetime.fromtimestamp(int(sub["timestamp"]), tz=ZoneInfo("UTC")).astimezone(IST)
-                        if t >= bot.challenge_post_times[idx]:
-                            solved = True
-                            break
-
-                if solved:
+                if state.solved(idx):
                     counts[idx] += 1
-                    key = (uid, idx)
+                    key = (state.discord_id, idx)
                     if key not in bot.pending_explanations and key not in bot.explanations:
-                        bot.pending_explanations[key] = member
-                        await member.send(
+                        bot.pending_explanations[key] = state.member
+                        await state.member.send(
                             f"🎉 Congrats on solving today’s problem {idx+1} (`{slug}`)! "
                             "Please reply with a 20–500 character explanation (or attach an image)."
                         )
                 else:
-                    pendings[idx].append(member.display_name)
-
-                await asyncio.sleep(0.2)
+                    pendings[idx].append(state.member.display_name)
 
         status_text = (
             f"Status Update:\n"
             f"Problem 1 → Solved: {counts[0]} | Pending: {', '.join(pendings[0]) or 'None'}\n"
             f"Problem 2 → Solved: {counts[1]} | Pending: {', '.join(pendings[1]) or 'None'}"
         )
-        try:
-            await bot.status_message.edit(content=status_text)
-        except Exception as e:
-            logger.error("Failed to update status: %s", e)
+        # No-op passes cost nothing; long pending lists spill into extra messages.
+        bot.status_message.update(status_text)
 
-        await asyncio.sleep(300)
+        await clock.sleep(STATUS_INTERVAL)
 
-    await bot.status_message.edit(content="Submission window closed.")
+    await bot.status_message.close("Submission window closed.")
 
-@tasks.loop(time=results_time)
 async def compile_and_post_results():
     channel = bot.get_channel(CHALLENGE_CHANNEL_ID)
     guild   = channel.guild
-    role    = guild.get_role(ROLE_ID)
 
     solved_lists   = [[], []]
     unsolved_lists = [[], []]
+    archive_rows   = []
 
-    for member in role.members:
-        if member.bot:
-            continue
-        uid = str(member.id)
-        if uid not in bot.users_data:
-            continue
-
-        subs = await query_user_submissions(bot.users_data[uid]["leetcode_username"])
+    for state in await refresh_solve_matrix(await participant_states(guild), pause=0):
         for idx, slug in enumerate(bot.current_challenge_slugs):
-            done = any(
-                sub["titleSlug"] == slug and
-                dt.datetime.fromtimestamp(int(sub["timestamp"]), tz=ZoneInfo("UTC")).astimezone(IST) >= bot.challenge_post_times[idx]
-                for sub in subs
-            )
-            key = (uid, idx)
-            if done and key in bot.explanations:
-                solved_lists[idx].append(member.display_name)
+            key = (state.discord_id, idx)
+            explained = key in bot.explanations
+            penalty = 0
+            if state.solved(idx) and explained:
+                solved_lists[idx].append(state.member.display_name)
             else:
-                unsolved_lists[idx].append(member.display_name)
-                bot.balances[uid] = bot.balances.get(uid, 0) - 100
+                unsolved_lists[idx].append(state.member.display_name)
+                penalty = 100
+                bot.balances[state.discord_id] = bot.balances.get(state.discord_id, 0) - penalty
+            archive_rows.append({
+                "slug": slug, "user": state.discord_id, "solved": state.solved(idx),
+                "solved_at": state.solved_at[idx], "explained": explained, "penalty": penalty,
+            })
+
+    if archive_rows and bot.challenge_post_times:
+        challenge_date = bot.challenge_post_times[0].astimezone(IST).date()
+        await asyncio.to_thread(bot.results_archive.append_day, challenge_date, archive_rows)
+    elif archive_rows:
+        # Post times are only kept in memory, so a restart since the post loses the date.
+        logger.warning("Not archiving %d result rows: the challenge post time is unknown", len(archive_rows),
+                       extra={"operation": "archive_results"})
 
     desc = ""
     for idx in (0, 1):
@@ -557,8 +624,7 @@ async def compile_and_post_results():
     await channel.send(embed=embed)
 
     # Persist balances
-    with open(BALANCES_FILE, "w") as f:
-        json.dump(bot.balances, f)
+    jsoncodec.dump_file(BALANCES_FILE, bot.balances)
 
 
 # ------------------------- DM Handling for Explanation Submissions -------------------------
@@ -597,15 +663,51 @@ async def on_message(message):
         return await message.channel.send("✅ Explanation recorded!")
 
 # ------------------------- Bot Startup -------------------------
+@bot.event
+async def setup_hook():
+    """Read the data files off the event loop, in parallel."""
+    with boot.phase("data_files"):
+        bot.users_data, bot.balances = await asyncio.gather(
+            asyncio.to_thread(jsoncodec.load_file, USERS_FILE, {}),
+            asyncio.to_thread(jsoncodec.load_file, BALANCES_FILE, {}),
+        )
+        bot.daily_queue, bot.participants, bot.results_archive = await asyncio.gather(
+            asyncio.to_thread(DailyQueue),
+            asyncio.to_thread(ParticipantIndex, ROLE_ID),
+            asyncio.to_thread(ResultsArchive),
+        )
+    await bot.load_extension("cogs.admin")
+    bot.setup_done_at = time.perf_counter()
+
 @bot.event
 async def on_ready():
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="a code race!"))
     logger.info("Logged in as %s", bot.user)
-    if not send_daily_challenge.is_running():
-        send_daily_challenge.start()
-    if not compile_and_post_results.is_running():
-        compile_and_post_results.start()
+    if not boot.reported:
+        boot.record("gateway", time.perf_counter() - bot.setup_done_at)
+        logger.info(boot.report())
+    start_schedules()
+    channel = bot.get_channel(CHALLENGE_CHANNEL_ID)
+    if channel:
+        bot.supervisor.spawn(
+            "participant-index", lambda: bot.participants.reconcile(channel.guild, list(bot.users_data)),
+            group="startup", replace=True,
+        )
+
+@bot.event
+async def on_audit_log_entry_create(entry):
+    """Role added/removed → keep the participant index in step (needs View Audit Log)."""
+    if entry.action is not discord.AuditLogAction.member_role_update or entry.target is None:
+        return
+    bot.participants.apply_role_change(
+        str(entry.target.id),
+        added=getattr(entry.changes.after, "roles", None) or [],
+        removed=getattr(entry.changes.before, "roles", None) or [],
+    )
 
 # ------------------------- Start the Bot -------------------------
-TOKEN = os.getenv("DISCORD_TOKEN")  
-bot.run(TOKEN)
+if __name__ == "__main__":
+    configure_logging(LOG_FILE)
+    TOKEN = os.getenv("DISCORD_TOKEN")
+    bot.run(TOKEN)
+
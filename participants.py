@@ -0,0 +1,122 @@
+# participants.py
+
+import asyncio
+import logging
+from collections import OrderedDict
+import discord
+import jsoncodec
+
+logger = logging.getLogger("leetcode_bot")
+
+PARTICIPANTS_FILE = "participants.json"
+MEMBER_CACHE_SIZE = 128
+FETCH_CONCURRENCY = 5
+
+
+class ParticipantIndex:
+    """
+    Registered users who hold the challenge role, without the members intent.
+
+    The index is the set of Discord ids from the identity data (users.json)
+    known to hold `role_id`. It is seeded by fetching each registered user
+    once. Audit-log role add/remove events and the member objects the bot
+    sees anyway (e.g. the author of !register) keep it current. Members are
+    fetched one at a time on demand and kept in a small LRU, so only
+    participants are ever loaded, never the whole guild.
+    """
+
+    def __init__(self, role_id: int, path: str = PARTICIPANTS_FILE, cache_size: int = MEMBER_CACHE_SIZE):
+        self.role_id = role_id
+        self.path = path
+        self.cache_size = cache_size
+        self.holders: set[str] = set(jsoncodec.load_file(path, []))
+        self.checked: set[str] = set()   # ids verified against Discord this run
+        self._members: OrderedDict[str, discord.Member] = OrderedDict()
+        self._gate = asyncio.Semaphore(FETCH_CONCURRENCY)
+        self.fetches = 0
+
+    def save(self):
+        jsoncodec.dump_file(self.path, sorted(self.holders))
+
+    def _set_holder(self, discord_id: str, holds: bool):
+        if holds == (discord_id in self.holders):
+            return
+        (self.holders.add if holds else self.holders.discard)(discord_id)
+        self.save()
+
+    def note_member(self, member: discord.Member):
+        """Fold in a member object seen elsewhere (command author, event payload)."""
+        uid = str(member.id)
+        self._set_holder(uid, any(role.id == self.role_id for role in member.roles))
+        self.checked.add(uid)
+        self._remember(uid, member)
+
+    def apply_role_change(self, discord_id: str, added: list, removed: list):
+        """Audit-log member_role_update: `added`/`removed` are role objects (or Objects)."""
+        if any(role.id == self.role_id for role in added):
+            self._set_holder(discord_id, True)
+        elif any(role.id == self.role_id for role in removed):
+            self._set_holder(discord_id, False)
+        self._members.pop(discord_id, None)   # cached roles are stale now
+
+    def _remember(self, discord_id: str, member: discord.Member):
+        self._members[discord_id] = member
+        self._members.move_to_end(discord_id)
+        while len(self._members) > self.cache_size:
+            self._members.popitem(last=False)
+
+    async def fetch_member(self, guild: discord.Guild, discord_id: str) -> discord.Member | None:
+        """One member by id, from the LRU or a single REST fetch."""
+        member = self._members.get(discord_id)
+        if member is not None:
+            self._members.move_to_end(discord_id)
+            return member
+        try:
+            async with self._gate:
+                self.fetches += 1
+                member = await guild.fetch_member(int(discord_id))
+        except discord.NotFound:
+            self._set_holder(discord_id, False)   # left the server
+            return None
+        self._remember(discord_id, member)
+        return member
+
+    async def reconcile(self, guild: discord.Guild, registered):
+        """Check every registered id not yet verified this run (the index seed)."""
+        pending = [uid for uid in registered if uid not in self.checked]
+        if not pending:
+            return
+
+        async def check(uid):
+            try:
+                member = await self.fetch_member(guild, uid)
+            except discord.HTTPException as e:
+                logger.warning("Could not fetch member %s: %s", uid, e,
+                               extra={"operation": "fetch_member", "user": uid, "guild": guild.id})
+                return
+            if member is not None:
+                self.note_member(member)
+            self.checked.add(uid)
+
+        await asyncio.gather(*(check(uid) for uid in pending))
+        logger.info("Participant index: %d of %d registered users hold the role", len(self.holders & set(registered)), len(registered),
+                    extra={"operation": "reconcile_participants", "guild": guild.id})
+
+    async def members(self, guild: discord.Guild, registered) -> list[discord.Member]:
+        """
+        Non-bot members who are both registered and role holders. A member
+        whose fetch fails is skipped this time; cached members never hit
+        Discord, so one failure can't drop the rest.
+        """
+        ids = [uid for uid in registered if uid in self.holders]
+
+        async def get(uid):
+            try:
+                return await self.fetch_member(guild, uid)
+            except discord.HTTPException as e:
+                logger.warning("Could not fetch member %s: %s", uid, e,
+                               extra={"operation": "fetch_member", "user": uid, "guild": guild.id})
+                return None
+
+        fetched = await asyncio.gather(*(get(uid) for uid in ids))
+        return [m for m in fetched if m is not None and not m.bot]
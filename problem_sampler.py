@@ -0,0 +1,140 @@
+# problem_sampler.py
+
+import random
+from collections import Counter
+import jsoncodec
+from catalog import ProblemCatalog, get_catalog
+
+SAMPLER_CONFIG_FILE = "sampler_config.json"
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+DEFAULT_CONFIG = {
+    "difficulty": {"Easy": 1.0},   # matches the old EASY-only daily picks
+    "tags": {},                    # tag slug → multiplier
+    "favor_uncovered": True,       # boost tags that recent dailies haven't covered
+    "recent_window": 30,           # how many past dailies count as "recent"
+}
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    def __init__(self, weights: list[float]):
+        n = len(weights)
+        total = sum(weights)
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        if not n or total <= 0:
+            return
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng: random.Random) -> int:
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class ProblemSampler:
+    """
+    Weighted daily-problem picker over the local catalog.
+
+    Per-guild weights combine a difficulty distribution, explicit tag
+    multipliers and (optionally) a boost for tags the last few dailies did
+    not cover. Used problems are dropped before the alias table is built, and
+    a table is only rebuilt when the catalog, the config or the used set
+    changes.
+    """
+
+    def __init__(self, catalog: ProblemCatalog, path: str = SAMPLER_CONFIG_FILE):
+        self.catalog = catalog
+        self.path = path
+        self.configs: dict[str, dict] = jsoncodec.load_file(path, {})
+        self._tables: dict[str, tuple] = {}   # guild → (key, candidates, AliasTable)
+
+    def save(self):
+        jsoncodec.dump_file(self.path, self.configs, indent=True)
+
+    def config_for(self, guild_id) -> dict:
+        return {**DEFAULT_CONFIG, **self.configs.get(str(guild_id), {})}
+
+    def set_weight(self, guild_id, kind: str, name: str, weight: float):
+        """kind is "difficulty" or "tags"; a weight of 0 disables that bucket."""
+        key = name.capitalize() if kind == "difficulty" else name.lower()
+        if kind == "difficulty" and key not in DIFFICULTIES:
+            raise ValueError(f"unknown difficulty {name!r}; expected one of {', '.join(DIFFICULTIES)}")
+        cfg = self.configs.setdefault(str(guild_id), {})
+        bucket = dict(cfg.get(kind, DEFAULT_CONFIG[kind]))
+        bucket[key] = weight
+        cfg[kind] = bucket
+        self._tables.pop(str(guild_id), None)
+        self.save()
+
+    def _problem_weights(self, cfg: dict, used: set[str], recent: list[str]) -> tuple[list[dict], list[float]]:
+        tag_weights = cfg["tags"]
+        coverage = Counter()
+        if cfg["favor_uncovered"]:
+            for slug in recent:
+                q = self.catalog.get(slug)
+                if q:
+                    coverage.update(tag["slug"] for tag in q.get("topicTags") or [])
+
+        candidates, weights = [], []
+        for q in self.catalog.problems:
+            if q.get("isPaidOnly") or q["titleSlug"] in used:
+                continue
+            w = cfg["difficulty"].get(q["difficulty"], 0.0)
+            if w <= 0:
+                continue
+            tags = [tag["slug"] for tag in q.get("topicTags") or []]
+            if tags:
+                w *= sum(tag_weights.get(t, 1.0) / (1 + coverage[t]) for t in tags) / len(tags)
+            if w > 0:
+                candidates.append(q)
+                weights.append(w)
+        return candidates, weights
+
+    def _table(self, guild_id, used_slugs: list[str]):
+        guild = str(guild_id)
+        cfg = self.config_for(guild)
+        key = (self.catalog.version, jsoncodec.dumpb(cfg, sort_keys=True), len(used_slugs))
+        cached = self._tables.get(guild)
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+        recent = used_slugs[-cfg["recent_window"]:] if cfg["recent_window"] else []
+        candidates, weights = self._problem_weights(cfg, set(used_slugs), recent)
+        table = AliasTable(weights)
+        self._tables[guild] = (key, candidates, table)
+        return candidates, table
+
+    def pick(self, guild_id, used_slugs: list[str], count: int = 1, seed=None) -> list[dict]:
+        """Draw `count` distinct unused problems; same seed + inputs → same picks."""
+        candidates, table = self._table(guild_id, used_slugs)
+        if len(candidates) < count:
+            return []
+        rng = random.Random(seed)
+        picked: dict[int, dict] = {}
+        while len(picked) < count:
+            i = table.sample(rng)
+            picked.setdefault(i, candidates[i])
+        return list(picked.values())
+
+
+_sampler = None
+
+def get_sampler() -> ProblemSampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = ProblemSampler(get_catalog())
+    return _sampler
@@ -0,0 +1,263 @@
+# recommender.py
+
+import asyncio
+import heapq
+import math
+from catalog import ProblemCatalog, get_catalog
+from solved_index import SolvedIndex, get_solved_index
+
+try:
+    import numpy as np
+except ImportError:  # optional: falls back to a pure-Python scorer
+    np = None
+
+BACKEND = "numpy" if np is not None else "python"
+
+DIFFICULTY_LEVEL = {"Easy": 0, "Medium": 1, "Hard": 2}
+TAG_WEIGHT = 0.65      # share of the score from covering weak topics...
+FIT_WEIGHT = 0.35      # ...and from sitting at the right difficulty
+FIT_WIDTH = 0.6        # spread of the difficulty-fit curve, in difficulty levels
+STRETCH = 0.35         # how far above their usual level a pick aims, at median skill
+FOCUS_TAGS = 3
+DEFAULT_K = 5
+PRECOMPUTE_K = 25      # kept per user so picks survive a few new solves
+SCORE_DECIMALS = 9     # scores are rounded so float noise can't reorder ties between backends
+
+
+def difficulty_target(counts: list[float], beats: list[float] | None) -> float:
+    """
+    Level (0 = Easy .. 2 = Hard) a user's next problem should sit at: the
+    mean difficulty of what they have solved, stretched upward by how they
+    compare to others (beat percentiles; median when unknown).
+    """
+    total = sum(counts)
+    level = (counts[1] + 2 * counts[2]) / total if total else 0.0
+    skill = sum(beats) / len(beats) / 100 if beats else 0.5
+    return min(2.0, max(0.0, level + 2 * STRETCH * skill))
+
+
+def profile_inputs(profile: dict | None) -> tuple[list[float] | None, list[float] | None, dict | None]:
+    """
+    (counts by Easy/Medium/Hard, beat percentiles, solves by tag slug) from a
+    !stats payload. Lifetime counts are only used when the payload has both
+    the difficulty and the tag breakdown, so both halves of the score
+    describe the same history; otherwise both come from local history.
+    """
+    if not profile:
+        return None, None, None
+    counts = profile.get("counts_by_diff") or {}
+    beats = profile.get("beats_by_diff") or {}
+    by_tag = profile.get("solved_by_tag") or {}
+    beats = [float(beats[d]) for d in DIFFICULTY_LEVEL if beats.get(d) is not None] or None
+    if not counts or not by_tag:
+        return None, beats, None
+    return [float(counts.get(d, 0)) for d in DIFFICULTY_LEVEL], beats, by_tag
+
+
+class Recommender:
+    """
+    Picks unsolved problems that fill the gaps in a user's topic coverage
+    at a difficulty just above what they usually solve.
+
+    A user's tag gap is how far their share of solves per topic tag falls
+    short of that tag's share of the catalog. Tag and difficulty counts
+    are the lifetime ones from the user's public profile when known (see
+    profile_inputs). Which problems count as already solved comes from
+    the solved index over history.db, which both bots feed; like duel
+    picks, that is best-effort for ACs older than the bot's first sync
+    of the user.
+
+    A problem scores by the mean gap over its tags plus a bell-shaped fit
+    between its difficulty and the user's target level. With numpy, every
+    user is scored against every problem at once as a users x problems
+    matrix; `precompute` does the whole server in one pass and `recommend`
+    serves from that, rescoring a single user only when their picks run
+    out.
+    """
+
+    def __init__(self, catalog: ProblemCatalog, index: SolvedIndex):
+        self.catalog = catalog
+        self.index = index
+        self.picks: dict[str, dict] = {}   # username → precomputed result
+        self._built_for = -1
+
+    def _build(self):
+        """Catalog-derived tag and difficulty tables, rebuilt when the catalog changes."""
+        if self._built_for == self.catalog.version:
+            return
+        problems = self.catalog.problems
+        tag_ids: dict[str, int] = {}
+        self.tag_names: list[str] = []
+        self.tag_slugs: list[str] = []
+        self.problem_tags: list[tuple[int, ...]] = []
+        for q in problems:
+            ids = []
+            for tag in q.get("topicTags") or []:
+                if tag["slug"] not in tag_ids:
+                    tag_ids[tag["slug"]] = len(self.tag_names)
+                    self.tag_names.append(tag["name"])
+                    self.tag_slugs.append(tag["slug"])
+                ids.append(tag_ids[tag["slug"]])
+            self.problem_tags.append(tuple(ids))
+        self.levels = [DIFFICULTY_LEVEL.get(q["difficulty"], 1) for q in problems]
+        self.free = [not q.get("isPaidOnly") for q in problems]
+
+        tag_total = [0] * len(self.tag_names)
+        for ids in self.problem_tags:
+            for t in ids:
+                tag_total[t] += 1
+        assigned = sum(tag_total) or 1
+        self.expected = [count / assigned for count in tag_total]   # each tag's share of the catalog
+
+        if np is not None:
+            n, t = len(problems), len(self.tag_names)
+            self._tags = np.zeros((n, t), dtype=np.float64)
+            for i, ids in enumerate(self.problem_tags):
+                self._tags[i, list(ids)] = 1.0
+            # Row-normalized copy: tag_gap @ _tag_mean.T is the mean gap over each problem's tags.
+            self._tag_mean = self._tags / np.maximum(self._tags.sum(axis=1, keepdims=True), 1)
+            self._levels = np.array(self.levels, dtype=np.float64)
+            self._level_onehot = np.eye(3, dtype=np.float64)[self._levels.astype(int)]
+            self._paid = ~np.array(self.free, dtype=bool)
+            self._expected = np.array(self.expected, dtype=np.float64)
+
+        self._problems = problems
+        self._built_for = self.catalog.version
+        self.picks.clear()
+
+    # ------------------------- Scoring -------------------------
+    def _rank(self, masks: dict[str, int], profiles: dict, k: int) -> dict[str, dict]:
+        if not masks or not self._problems:
+            return {user: {"picks": [], "focus": [], "target": 0.0} for user in masks}
+        if np is not None:
+            return self._rank_numpy(masks, profiles, k)
+        return {user: self._rank_one(mask, profiles.get(user), k) for user, mask in masks.items()}
+
+    def _rank_numpy(self, masks: dict[str, int], profiles: dict, k: int) -> dict[str, dict]:
+        users = list(masks)
+        n = len(self._problems)
+        nbytes = (n + 7) // 8
+        full = (1 << n) - 1
+        solved = np.unpackbits(
+            np.frombuffer(b"".join((masks[u] & full).to_bytes(nbytes, "little") for u in users), dtype=np.uint8)
+            .reshape(len(users), nbytes),
+            axis=1, bitorder="little",
+        )[:, :n].astype(np.float64)                                      # users x problems
+
+        # Per-user tag and difficulty counts: lifetime profile where known, local history otherwise.
+        tag_counts = solved @ self._tags                                  # users x tags
+        level_counts = solved @ self._level_onehot                        # users x 3
+        targets = np.empty(len(users), dtype=np.float64)
+        for row, user in enumerate(users):
+            counts, beats, by_tag = profile_inputs(profiles.get(user))
+            if by_tag is not None:
+                tag_counts[row] = [by_tag.get(slug, 0) for slug in self.tag_slugs]
+            targets[row] = difficulty_target(counts or level_counts[row].tolist(), beats)
+
+        # Tag gaps: how far each user's share of a tag trails the catalog's.
+        share = tag_counts / np.maximum(tag_counts.sum(axis=1, keepdims=True), 1)
+        gap = np.round(np.maximum(self._expected - share, 0), SCORE_DECIMALS)
+        weight = gap / np.maximum(gap.max(axis=1, keepdims=True), 1e-9)
+        tag_score = weight @ self._tag_mean.T                             # users x problems
+
+        fit = np.exp(-((self._levels[None, :] - targets[:, None]) ** 2) / (2 * FIT_WIDTH ** 2))
+
+        scores = np.round(TAG_WEIGHT * tag_score + FIT_WEIGHT * fit, SCORE_DECIMALS)
+        scores[solved > 0] = -np.inf
+        scores[:, self._paid] = -np.inf
+
+        # Best score first, lowest catalog index among ties (as _rank_one does).
+        k = min(k, n)
+        index = np.broadcast_to(np.arange(n), scores.shape)
+        top = np.lexsort((index, -scores), axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        focus = np.argsort(-gap, axis=1, kind="stable")[:, :FOCUS_TAGS]
+
+        return {
+            user: {
+                "picks": [(int(i), float(s)) for i, s in zip(top[row], top_scores[row]) if np.isfinite(s)],
+                "focus": [int(t) for t in focus[row] if gap[row, t] > 0],
+                "target": float(targets[row]),
+            }
+            for row, user in enumerate(users)
+        }
+
+    def _rank_one(self, mask: int, profile: dict | None, k: int) -> dict:
+        """The same scoring as _rank_numpy, one user at a time."""
+        solved = [i for i in range(len(self._problems)) if mask >> i & 1]
+        tag_counts = [0] * len(self.tag_names)
+        level_counts = [0.0, 0.0, 0.0]
+        for i in solved:
+            level_counts[self.levels[i]] += 1
+            for t in self.problem_tags[i]:
+                tag_counts[t] += 1
+        counts, beats, by_tag = profile_inputs(profile)
+        if by_tag is not None:
+            tag_counts = [by_tag.get(slug, 0) for slug in self.tag_slugs]
+        assigned = sum(tag_counts) or 1
+        gap = [round(max(e - c / assigned, 0.0), SCORE_DECIMALS) for e, c in zip(self.expected, tag_counts)]
+        top_gap = max(gap, default=0.0) or 1e-9
+        weight = [g / top_gap for g in gap]
+
+        target = difficulty_target(counts or level_counts, beats)
+        fit = [math.exp(-((level - target) ** 2) / (2 * FIT_WIDTH ** 2)) for level in range(3)]
+
+        def scored():
+            for i, tags in enumerate(self.problem_tags):
+                if self.free[i] and not mask >> i & 1:
+                    tag_score = sum(weight[t] for t in tags) / len(tags) if tags else 0.0
+                    yield round(TAG_WEIGHT * tag_score + FIT_WEIGHT * fit[self.levels[i]], SCORE_DECIMALS), i
+
+        picks = heapq.nlargest(k, scored(), key=lambda pair: (pair[0], -pair[1]))
+        focus = sorted((t for t in range(len(gap)) if gap[t] > 0), key=lambda t: -gap[t])[:FOCUS_TAGS]
+        return {"picks": [(i, s) for s, i in picks], "focus": focus, "target": target}
+
+    # ------------------------- Entry points -------------------------
+    async def precompute(self, usernames, profiles: dict | None = None):
+        """
+        Rank every user in one pass and keep their top PRECOMPUTE_K picks.
+        `profiles` maps username → !stats payload (counts_by_diff,
+        beats_by_diff, solved_by_tag).
+        """
+        await self.catalog.ensure_loaded()
+        self._build()
+        version = self.catalog.version
+        profiles = {user.lower(): p for user, p in (profiles or {}).items()}
+        await self.index.refresh()
+        masks = {user.lower(): self.index.solved_mask(user) for user in usernames}
+        # Bitsets are snapshotted here, so the scoring thread never reads live index state.
+        ranked = await asyncio.to_thread(self._rank, masks, profiles, PRECOMPUTE_K)
+        if version == self.catalog.version:   # else _build has already dropped them as stale
+            self.picks.update(ranked)
+
+    async def recommend(self, username: str, profile: dict | None = None, k: int = DEFAULT_K) -> dict:
+        """
+        Top `k` picks for one user: {"problems": [(problem, score)], "focus":
+        [tag names], "target": level}. Served from the last precompute while
+        it still has `k` picks the user hasn't solved since.
+        """
+        await self.catalog.ensure_loaded()
+        self._build()
+        user = username.lower()
+        await self.index.refresh()
+        mask = self.index.solved_mask(user)
+        result = self.picks.get(user)
+        fresh = [(i, s) for i, s in result["picks"] if not mask >> i & 1] if result else []
+        if len(fresh) < k:
+            result = self._rank({user: mask}, {user: profile}, max(k, PRECOMPUTE_K))[user]
+            self.picks[user] = result
+            fresh = result["picks"]
+        return {
+            "problems": [(self._problems[i], s) for i, s in fresh[:k]],
+            "focus": [self.tag_names[t] for t in result["focus"]],
+            "target": result["target"],
+        }
+
+
+_recommender = None
+
+def get_recommender() -> Recommender:
+    global _recommender
+    if _recommender is None:
+        _recommender = Recommender(get_catalog(), get_solved_index())
+    return _recommender
@@ -0,0 +1,60 @@
+# records.py
+
+from array import array
+
+
+class Submission:
+    """One accepted submission, with the timestamp parsed once into epoch seconds."""
+
+    __slots__ = ("submission_id", "slug", "timestamp")
+
+    def __init__(self, submission_id: str, slug: str, timestamp: int):
+        self.submission_id = submission_id
+        self.slug = slug
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_payload(cls, sub: dict) -> "Submission":
+        ts = int(sub["timestamp"])
+        return cls(str(sub.get("id") or f"{sub['titleSlug']}@{ts}"), sub["titleSlug"], ts)
+
+    def __repr__(self):
+        return f"Submission({self.slug!r}, {self.timestamp})"
+
+
+class MemberState:
+    """
+    A participant's state for the current set of challenges.
+
+    `solved_at` holds one epoch timestamp per problem (0 = not solved since
+    the problem was posted), packed in an array rather than a list of ints.
+    """
+
+    __slots__ = ("discord_id", "username", "member", "solved_at")
+
+    def __init__(self, discord_id: str, username: str, member, problems: int):
+        self.discord_id = discord_id
+        self.username = username
+        self.member = member
+        self.solved_at = array("q", bytes(8 * problems))
+
+    def solved(self, idx: int) -> bool:
+        return self.solved_at[idx] > 0
+
+
+def solve_matrix(states: list[MemberState], slugs: list[str], thresholds: list[int], latest_acs: dict) -> list[MemberState]:
+    """
+    Fill every member's `solved_at` in one pass over the states.
+
+    `thresholds[i]` is the epoch second problem i was posted; `latest_acs`
+    maps (lowercased username, slug) → latest AC epoch, as returned by
+    SubmissionHistory.latest_acs for the whole batch at once.
+    """
+    pairs = list(zip(range(len(slugs)), slugs, thresholds))
+    for state in states:
+        user = state.username.lower()
+        row = state.solved_at
+        for idx, slug, threshold in pairs:
+            ts = latest_acs.get((user, slug), 0)
+            row[idx] = ts if ts >= threshold else 0
+    return states
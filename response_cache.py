@@ -0,0 +1,112 @@
+# response_cache.py
+
+import hashlib
+import sqlite3
+from functools import lru_cache
+import clock
+import jsoncodec
+
+RESPONSE_CACHE_DB = "response_cache.db"
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+EVICT_CHECK_EVERY = 200   # writes between size checks
+ACCESS_FLUSH_EVERY = 500  # cache hits between batched `accessed` updates
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key      TEXT PRIMARY KEY,
+    body     BLOB    NOT NULL,
+    size     INTEGER NOT NULL,
+    expires  REAL    NOT NULL,
+    accessed REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed);
+"""
+
+
+@lru_cache(maxsize=256)
+def _query_digest(query: str) -> bytes:
+    return hashlib.sha1(query.encode()).digest()
+
+
+def cache_key(query: str, variables: dict | None) -> str:
+    """Stable key for a GraphQL document plus its variables."""
+    digest = hashlib.sha1(_query_digest(query))
+    digest.update(jsoncodec.dumpb(variables or {}, sort_keys=True))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Raw LeetCode response bodies with per-entry TTLs, in a SQLite file that
+    bot.py and main.py open side by side (WAL mode lets them read while the
+    other writes). When the file grows past `max_bytes`, the least recently
+    read entries are evicted down to 90% of the budget. Read times are
+    kept in memory and written in batches, so a cache hit is a read only.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_DB, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=5)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._writes = 0
+        self._accessed: dict[str, float] = {}   # key → last hit, not yet written
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        now = clock.time()
+        row = self.db.execute("SELECT body FROM responses WHERE key = ? AND expires > ?", (key, now)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._accessed[key] = now
+        if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+            with self.db:
+                self.db.execute("BEGIN")
+                self._flush_accessed()
+        return row[0]
+
+    def set(self, key: str, body: bytes, ttl: float):
+        now = clock.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (key, body, len(body), now + ttl, now),
+        )
+        self._writes += 1
+        if self._writes % EVICT_CHECK_EVERY == 0:
+            self.evict()
+
+    def _flush_accessed(self):
+        self.db.executemany("UPDATE responses SET accessed = ? WHERE key = ?", ((t, k) for k, t in self._accessed.items()))
+        self._accessed.clear()
+
+    def evict(self):
+        now = clock.time()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self._flush_accessed()   # so the LRU order below reflects recent hits
+            self.db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = total - int(self.max_bytes * 0.9)
+            freed = 0
+            doomed = []
+            for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                doomed.append((key,))
+                freed += size
+                if freed >= target:
+                    break
+            self.db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+
+_cache = None
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,162 @@
+# results_archive.py
+
+import datetime as dt
+import os
+from array import array
+
+RESULTS_ARCHIVE_DIR = "results_archive"
+
+# One append-only file per column, one row per (challenge day, member, problem).
+COLUMNS = {
+    "day": "i",        # challenge date as days since 1970-01-01
+    "slug": "i",       # id in slugs.txt
+    "user": "i",       # id in users.txt (Discord ids)
+    "solved": "b",
+    "solved_at": "q",  # epoch seconds of the counted AC, 0 if unsolved
+    "explained": "b",
+    "penalty": "i",
+}
+EPOCH = dt.date(1970, 1, 1)
+
+
+class StringTable:
+    """Append-only string ↔ id dictionary, one value per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.values: list[str] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.values = f.read().splitlines()
+        self.ids = {value: i for i, value in enumerate(self.values)}
+
+    def id_for(self, value: str) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(value + "\n")
+        return i
+
+
+class ResultsArchive:
+    """
+    Every day's challenge outcome, stored column by column.
+
+    A day is appended by extending each column file, so writes never
+    rewrite history. Queries load only the columns they need. A crash
+    half-way through an append leaves some columns longer than others;
+    they are truncated back to the shortest column on open.
+    """
+
+    def __init__(self, root: str = RESULTS_ARCHIVE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.slugs = StringTable(os.path.join(root, "slugs.txt"))
+        self.users = StringTable(os.path.join(root, "users.txt"))
+        self.rows = self._repair()
+        days = self.column("day")
+        self.last_day = days[-1] if days else -1
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f"{name}.col")
+
+    def _repair(self) -> int:
+        sizes = {}
+        for name, code in COLUMNS.items():
+            path = self._path(name)
+            sizes[name] = (os.path.getsize(path) if os.path.exists(path) else 0) // array(code).itemsize
+        rows = min(sizes.values())
+        for name, count in sizes.items():
+            if count > rows:
+                with open(self._path(name), "r+b") as f:
+                    f.truncate(rows * array(COLUMNS[name]).itemsize)
+        return rows
+
+    def column(self, name: str) -> array:
+        values = array(COLUMNS[name])
+        path = self._path(name)
+        if self.rows and os.path.exists(path):
+            with open(path, "rb") as f:
+                values.fromfile(f, self.rows)
+        return values
+
+    def append_day(self, date: dt.date, results: list[dict]) -> bool:
+        """
+        Append one day's rows (keys: slug, user, solved, solved_at, explained,
+        penalty). Days must arrive in order; a day already archived is skipped.
+        """
+        day = (date - EPOCH).days
+        if day <= self.last_day or not results:
+            return False
+        encoded = {
+            "day": [day] * len(results),
+            "slug": [self.slugs.id_for(r["slug"]) for r in results],
+            "user": [self.users.id_for(str(r["user"])) for r in results],
+            "solved": [int(r["solved"]) for r in results],
+            "solved_at": [int(r["solved_at"] or 0) for r in results],
+            "explained": [int(r["explained"]) for r in results],
+            "penalty": [int(r["penalty"]) for r in results],
+        }
+        for name, values in encoded.items():
+            with open(self._path(name), "ab") as f:
+                array(COLUMNS[name], values).tofile(f)
+        self.rows += len(results)
+        self.last_day = day
+        return True
+
+    # ------------------------- Queries -------------------------
+    def user_summary(self, discord_id: str) -> dict | None:
+        """Solve rate, explanations, penalties and streaks for one member."""
+        uid = self.users.ids.get(str(discord_id))
+        if uid is None:
+            return None
+        users, days, solved = self.column("user"), self.column("day"), self.column("solved")
+        explained, penalty = self.column("explained"), self.column("penalty")
+        rows = [i for i, u in enumerate(users) if u == uid]
+        if not rows:
+            return None
+
+        # A day counts toward a streak when every problem that day was solved.
+        per_day: dict[int, bool] = {}
+        for i in rows:
+            per_day[days[i]] = per_day.get(days[i], True) and bool(solved[i])
+        # Challenge days are consecutive calendar days, so a gap (days the
+        # member had no row) breaks the streak too.
+        best = run = 0
+        prev = None
+        for day, cleared in per_day.items():   # rows are appended in day order
+            if not cleared:
+                run = 0
+            elif prev is not None and day == prev + 1:
+                run += 1
+            else:
+                run = 1
+            best = max(best, run)
+            prev = day
+        current = run if prev == self.last_day else 0
+
+        return {
+            "days": len(per_day),
+            "problems": len(rows),
+            "solved": sum(solved[i] for i in rows),
+            "explained": sum(explained[i] for i in rows),
+            "penalty": sum(penalty[i] for i in rows),
+            "best_streak": best,
+            "current_streak": current,
+            "first_day": EPOCH + dt.timedelta(days=days[rows[0]]),
+        }
+
+    def hardest(self, limit: int = 5, min_attempts: int = 3) -> list[tuple[str, int, int]]:
+        """(slug, solved, attempts) for the problems with the lowest solve rate."""
+        totals: dict[int, list[int]] = {}
+        for slug, ok in zip(self.column("slug"), self.column("solved")):
+            t = totals.setdefault(slug, [0, 0])
+            t[0] += ok
+            t[1] += 1
+        ranked = sorted(
+            ((self.slugs.values[slug], ok, n) for slug, (ok, n) in totals.items() if n >= min_attempts),
+            key=lambda r: (r[1] / r[2], -r[2]),
+        )
+        return ranked[:limit]
@@ -0,0 +1,397 @@
+# simulate.py
+"""
+Replay the daily challenge cycle (plus duels and monthly settlements) on a
+virtual clock, against in-process stand-ins for LeetCode and Discord.
+
+    python simulate.py --days 30 --users 25 --duels 2
+
+Runs in a scratch directory, so no real data file is touched, and prints
+request counts and (simulated) latencies per LeetCode operation and
+Discord call when it is done.
+"""
+
+import argparse
+import asyncio
+import bisect
+import datetime as dt
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+from collections import Counter, defaultdict
+import clock
+import jsoncodec
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class CallLog:
+    """Request counts and simulated latencies, keyed by operation."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+
+    async def call(self, op: str, latency: float):
+        await clock.sleep(latency)
+        self.latencies[op].append(latency)
+
+    def total(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    def report(self, title: str) -> list[str]:
+        lines = [f"{title}: {self.total()} calls"]
+        for op, lat in sorted(self.latencies.items(), key=lambda kv: -len(kv[1])):
+            lines.append(
+                f"  {op:<24} {len(lat):>7}   p50 {percentile(lat, 0.5) * 1000:5.0f}ms"
+                f"   p95 {percentile(lat, 0.95) * 1000:5.0f}ms   max {max(lat) * 1000:5.0f}ms"
+            )
+        return lines
+
+
+# ------------------------- LeetCode stand-in -------------------------
+class FakeResponse:
+    def __init__(self, body: bytes, status: int = 200):
+        self.body = body
+        self.status = status
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+class FakeCall:
+    """What session.post(...) returns: the request runs on `async with` entry."""
+
+    def __init__(self, server: "FakeLeetCode", body: bytes):
+        self.server = server
+        self.body = body
+
+    async def __aenter__(self) -> FakeResponse:
+        return await self.server.handle(self.body)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeLeetCode:
+    """
+    Answers the GraphQL operations the bots send, by operation name, from a
+    synthetic problem set and per-user AC lists that the simulator fills in
+    as members "solve" problems. Installed in place of the aiohttp session.
+    """
+
+    closed = False
+
+    def __init__(self, rng: random.Random, problems: int, latency: tuple[float, float]):
+        self.rng = rng
+        self.latency = latency
+        self.log = CallLog()
+        self.problems = [
+            {
+                "frontendQuestionId": str(i + 1),
+                "title": f"Problem {i + 1}",
+                "titleSlug": f"problem-{i + 1}",
+                "difficulty": DIFFICULTIES[i % 3],
+                "isPaidOnly": rng.random() < 0.05,
+                "topicTags": [{"name": f"Tag {i % 7}", "slug": f"tag-{i % 7}"}],
+            }
+            for i in range(problems)
+        ]
+        self.by_slug = {p["titleSlug"]: p for p in self.problems}
+        self.users: set[str] = set()
+        self._ac_times: dict[str, list[int]] = defaultdict(list)   # sorted AC timestamps per user
+        self._acs: dict[str, list[dict]] = defaultdict(list)
+        self._ids = 0
+
+    def post(self, url, data=None, headers=None) -> FakeCall:
+        return FakeCall(self, data)
+
+    def add_ac(self, username: str, slug: str, timestamp: int):
+        user = username.lower()
+        self._ids += 1
+        i = bisect.bisect(self._ac_times[user], timestamp)
+        self._ac_times[user].insert(i, timestamp)
+        self._acs[user].insert(i, {"id": str(self._ids), "titleSlug": slug, "timestamp": str(timestamp)})
+
+    def recent_acs(self, username: str, limit: int) -> list[dict]:
+        user = username.lower()
+        visible = bisect.bisect(self._ac_times[user], int(clock.time()))
+        return self._acs[user][max(0, visible - limit):visible][::-1]
+
+    def _pool(self, variables: dict) -> list[dict]:
+        difficulty = ((variables.get("filters") or {}).get("difficulty") or "").capitalize()
+        return [p for p in self.problems if not difficulty or p["difficulty"] == difficulty]
+
+    async def handle(self, body: bytes) -> FakeResponse:
+        payload = jsoncodec.loads(body)
+        variables = payload.get("variables") or {}
+        op = re.match(r"\s*query\s+(\w+)", payload["query"]).group(1)
+        await self.log.call(op, self.rng.uniform(*self.latency))
+
+        if op == "problemsetQuestionList":
+            pool = self._pool(variables)
+            skip, limit = variables.get("skip", 0), variables.get("limit", 50)
+            data = {"problemsetQuestionList": {"total": len(pool), "questions": pool[skip:skip + limit]}}
+        elif op == "randomProblems":
+            pool = self._pool(variables)
+            data = {
+                f"p{key[4:]}": {"total": len(pool), "questions": pool[skip:skip + 1]}
+                for key, skip in variables.items() if key.startswith("skip")
+            }
+        elif op in ("problemsPaidOnly", "questionTitle"):
+            data = {
+                f"q{key[1:]}" if key != "titleSlug" else "question": self.by_slug.get(slug)
+                for key, slug in variables.items()
+            }
+        elif op == "getACSubmissions":
+            data = {"recentAcSubmissionList": self.recent_acs(variables["username"], variables.get("limit") or 20)}
+        elif op == "batchAcSubmissions":
+            limit = variables.get("limit") or 20
+            data = {key: self.recent_acs(name, limit) for key, name in variables.items() if key.startswith("u")}
+        elif op == "usersExist":
+            data = {key: {"username": name} if name.lower() in self.users else None for key, name in variables.items()}
+        else:
+            data = {}
+        return FakeResponse(jsoncodec.dumpb({"data": data}))
+
+
+# ------------------------- Discord stand-ins -------------------------
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.mention = f"<@&{role_id}>"
+
+
+class FakeMessage:
+    def __init__(self, discord_log: CallLog, rng: random.Random, content):
+        self.log, self.rng, self.content = discord_log, rng, content
+
+    async def edit(self, content=None, **kwargs):
+        await self.log.call("message.edit", self.rng.uniform(0.05, 0.2))
+        self.content = content
+
+    async def delete(self):
+        await self.log.call("message.delete", self.rng.uniform(0.05, 0.2))
+
+
+class FakeMember:
+    def __init__(self, sim: "Simulation", member_id: int, name: str, role: FakeRole):
+        self.sim = sim
+        self.id = member_id
+        self.name = self.display_name = name
+        self.mention = f"<@{member_id}>"
+        self.bot = False
+        self.roles = [role]
+
+    async def send(self, content=None, **kwargs):
+        await self.sim.discord.call("member.send", self.sim.rng.uniform(0.05, 0.2))
+        self.sim.on_dm(self, content or "")
+
+
+class FakeChannel:
+    def __init__(self, sim: "Simulation", channel_id: int, guild):
+        self.sim = sim
+        self.id = channel_id
+        self.guild = guild
+        self.sent: list = []
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self.sim.discord.call("channel.send", self.sim.rng.uniform(0.05, 0.2))
+        self.sent.append(content)
+        self.sim.on_post(content, embed)
+        return FakeMessage(self.sim.discord, self.sim.rng, content)
+
+
+class FakeGuild:
+    def __init__(self, sim: "Simulation", guild_id: int, role: FakeRole):
+        self.sim = sim
+        self.id = guild_id
+        self.role = role
+        self.members: dict[int, FakeMember] = {}
+
+    def get_role(self, role_id: int):
+        return self.role if role_id == self.role.id else None
+
+    async def fetch_member(self, member_id: int):
+        await self.sim.discord.call("guild.fetch_member", self.sim.rng.uniform(0.05, 0.2))
+        return self.members[member_id]
+
+
+# ------------------------- Simulation -------------------------
+class Simulation:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.discord = CallLog()
+        self.leetcode = FakeLeetCode(self.rng, args.problems, (args.latency_min, args.latency_max))
+        self.duel_results = Counter()
+        self.settlements: list[tuple[str, int]] = []
+        self.skill: dict[str, float] = {}   # leetcode username → chance of solving a given problem
+        self._tasks: set[asyncio.Task] = set()
+
+    def _background(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def solve(self, usernames, slug: str, start: float, window: float, boost: float = 1.0):
+        """Give each user a chance to AC `slug` somewhere in [start, start + window)."""
+        for username in usernames:
+            if self.rng.random() < min(1.0, self.skill[username] * boost):
+                self.leetcode.add_ac(username, slug, int(start + self.rng.uniform(60, window)))
+
+    def on_post(self, content, embed):
+        """A daily problem went out: every participant may solve it before results."""
+        if embed is None or not content or "Daily LeetCode Challenge" not in content:
+            return
+        slug = embed.url.rstrip("/").rsplit("/", 1)[-1]
+        window = clock.next_run(self.main.results_time, clock.now(self.main.IST)).timestamp() - clock.time()
+        self.solve(self.skill, slug, clock.time(), window)
+
+    def on_dm(self, member: FakeMember, content: str):
+        """Most solvers answer the congrats DM with an explanation a little later."""
+        if "Congrats" in content and self.rng.random() < self.args.explain_rate:
+            self._background(self.explain_later(str(member.id)))
+
+    async def explain_later(self, discord_id: str):
+        await clock.sleep(self.rng.uniform(60, 2 * 60 * 60))
+        bot = self.main.bot
+        for key in [k for k in bot.pending_explanations if k[0] == discord_id]:
+            bot.explanations[key] = {"type": "text", "content": "Two pointers from both ends, O(n)."}
+            bot.pending_explanations.pop(key, None)
+
+    async def duels(self, channel, members: list[FakeMember], usernames: dict[str, str]):
+        """A few duels at random times each day, driven through the real Duel cog."""
+        from cogs.duel import Duel
+        cog = Duel(self.main.bot)
+        while True:
+            await clock.sleep(self.rng.uniform(0, 2 * 86400 / max(self.args.duels, 1)))
+            a, b = self.rng.sample(members, 2)
+            players = [usernames[str(a.id)], usernames[str(b.id)]]
+            problem = await cog.fetch_random_problem(self.rng.choice(("EASY", "MEDIUM")), players)
+            if not problem:
+                self.duel_results["no problem"] += 1
+                continue
+            start = clock.time()
+            self.solve(players, problem["titleSlug"], start, 40 * 60, boost=0.8)
+            before = len(channel.sent)
+            await cog.watch_duel(channel, {"slug": problem["titleSlug"], "challenger": a, "opponent": b, "start_time": start})
+            outcome = " ".join(str(c) for c in channel.sent[before:])
+            self.duel_results["won" if "wins" in outcome else "draw"] += 1
+
+    async def months(self):
+        """Settle up on the first of every month, as an admin running !monthly would."""
+        bot = self.main.bot
+        while True:
+            today = clock.now(self.main.IST)
+            first = (today.replace(day=1) + dt.timedelta(days=32)).replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+            await clock.sleep_until(first)
+            user_ids, _, payments = self.main.monthly_settlement()
+            for uid in user_ids:
+                bot.balances[uid] = 0
+            self.settlements.append((first.strftime("%Y-%m"), len(payments)))
+
+    async def run(self):
+        import main
+        from daily_queue import DailyQueue
+        from leetcode_api import set_session, limiter
+        from participants import ParticipantIndex
+        from results_archive import ResultsArchive
+        self.main = main
+        bot = main.bot
+
+        # Identity data and the Discord side: one guild, one role, every member registered.
+        role = FakeRole(main.ROLE_ID)
+        guild = FakeGuild(self, 1, role)
+        channel = FakeChannel(self, main.CHALLENGE_CHANNEL_ID, guild)
+        usernames = {}
+        for i in range(self.args.users):
+            member = FakeMember(self, 1000 + i, f"member{i}", role)
+            guild.members[member.id] = member
+            lc_name = f"lc_user_{i}"
+            usernames[str(member.id)] = lc_name
+            self.leetcode.users.add(lc_name)
+            self.skill[lc_name] = self.rng.uniform(0.3, 0.95)
+        jsoncodec.dump_file("usernames.json", usernames)
+
+        set_session(self.leetcode)
+        bot.get_channel = lambda channel_id: channel if channel_id == main.CHALLENGE_CHANNEL_ID else None
+        bot.users_data = {uid: {"discord_username": f"member{int(uid) - 1000}", "leetcode_username": name} for uid, name in usernames.items()}
+        bot.balances = {uid: 0 for uid in usernames}
+        bot.daily_queue = DailyQueue()
+        bot.participants = ParticipantIndex(main.ROLE_ID)
+        bot.results_archive = ResultsArchive()
+
+        start = clock.time()
+        end = start + self.args.days * 86400 + 3600   # past the last results post
+        await bot.participants.reconcile(guild, list(bot.users_data))
+        main.start_schedules()
+        self._background(self.months())
+        if self.args.duels:
+            self._background(self.duels(channel, list(guild.members.values()), usernames))
+
+        wall = time.perf_counter()
+        await clock.get_clock().run_until(end)
+        wall = time.perf_counter() - wall
+
+        for task in list(self._tasks):
+            task.cancel()
+        await bot.supervisor.shutdown()
+        self.print_report(wall, limiter, bot)
+
+    def print_report(self, wall: float, limiter, bot):
+        archive = bot.results_archive
+        solved = archive.column("solved")
+        penalties = archive.column("penalty")
+        lines = [
+            f"Simulated {self.args.days} day(s), {self.args.users} members, in {wall:.1f}s wall time "
+            f"({clock.get_clock().jumps} clock jumps)",
+            "",
+            *self.leetcode.log.report("LeetCode requests"),
+            f"  rate limiter: {limiter.waits} waits, {limiter.waited:.1f}s simulated waiting",
+            "",
+            *self.discord.report("Discord calls"),
+            "",
+            f"Results archive: {archive.rows} rows, solve rate "
+            f"{(100 * sum(solved) / len(solved)) if solved else 0:.0f}%, penalties Rs {sum(penalties)}",
+            f"Duels: {dict(self.duel_results) or 'none'}",
+            f"Monthly settlements: {', '.join(f'{m}: {n} payments' for m, n in self.settlements) or 'none'}",
+        ]
+        if self.leetcode.log.total():
+            all_latencies = [x for lat in self.leetcode.log.latencies.values() for x in lat]
+            lines.append(f"Mean LeetCode latency {statistics.mean(all_latencies) * 1000:.0f}ms")
+        print("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duels", type=int, default=0, help="duels per day (0 to skip)")
+    parser.add_argument("--problems", type=int, default=900)
+    parser.add_argument("--start", type=dt.date.fromisoformat, default=dt.date(2025, 1, 1))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--explain-rate", type=float, default=0.85)
+    parser.add_argument("--latency-min", type=float, default=0.08)
+    parser.add_argument("--latency-max", type=float, default=0.40)
+    parser.add_argument("--workdir", help="scratch directory (default: a fresh temp dir)")
+    args = parser.parse_args()
+
+    os.chdir(args.workdir or tempfile.mkdtemp(prefix="leetcode-sim-"))
+    # Start just after midnight IST so the first day's post is part of the run.
+    ist = dt.timezone(dt.timedelta(hours=5, minutes=30))
+    virtual = clock.VirtualClock(dt.datetime.combine(args.start, dt.time(0, 1), ist).timestamp())
+    clock.install(virtual)
+    # Route thread work through the clock, so it settles before time jumps.
+    asyncio.to_thread = virtual.to_thread
+    asyncio.run(Simulation(args).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# solved_index.py
+
+import asyncio
+import random
+from catalog import ProblemCatalog, get_catalog
+from submission_history import SubmissionHistory, get_history
+
+
+def pick_set_bit(mask: int, rng: random.Random) -> int | None:
+    """Uniformly pick the position of one set bit in `mask`."""
+    if not mask:
+        return None
+    width = mask.bit_length()
+    # Rejection sampling stays O(1) while the pool is reasonably dense...
+    for _ in range(32):
+        i = rng.randrange(width)
+        if mask >> i & 1:
+            return i
+    # ...and only sparse pools fall back to walking the set bits.
+    k = rng.randrange(mask.bit_count())
+    while k:
+        mask &= mask - 1
+        k -= 1
+    return (mask & -mask).bit_length() - 1
+
+
+class SolvedIndex:
+    """
+    Per-user set of accepted problems, held as a bitset over the catalog.
+
+    The source of truth is the `solves` table in history.db, which both
+    bot processes write. The index tails that table by rowid, so solves
+    recorded by either process show up here after the next `refresh()`;
+    callers await it before picking, and lookups themselves never touch
+    the database. The bitsets are rebuilt whenever the catalog version changes, because
+    positions shift when the catalog is refreshed.
+
+    Freshness is best-effort: LeetCode only exposes a user's ~20 most
+    recent ACs publicly, so a newly seeded user's set starts from those
+    and grows as the poller sees new solves. A problem solved long before
+    the bot first synced the user can still be picked as "fresh".
+    """
+
+    def __init__(self, catalog: ProblemCatalog, history: SubmissionHistory):
+        self.catalog = catalog
+        self.history = history
+        self._slugs: dict[str, set[str]] = {}
+        self._bits: dict[str, int] = {}
+        self._built_for = -1
+        self._last_rowid = 0
+
+    def _sync(self):
+        if self._built_for != self.catalog.version:
+            self._bits = {user: self.catalog.mask_for(slugs) for user, slugs in self._slugs.items()}
+            self._built_for = self.catalog.version
+
+    async def refresh(self):
+        """Fold in solves recorded since the last refresh (read in a worker thread)."""
+        rows = await asyncio.to_thread(self.history.solves_after, self._last_rowid)
+        self._sync()
+        # A concurrent refresh may have folded in some of these rows already.
+        rows = [row for row in rows if row[0] > self._last_rowid]
+        if not rows:
+            return
+        self._last_rowid = rows[-1][0]
+        new: dict[str, list[str]] = {}
+        for _, user, slug in rows:
+            new.setdefault(user, []).append(slug)
+        for user, slugs in new.items():
+            self._slugs.setdefault(user, set()).update(slugs)
+            self._bits[user] = self._bits.get(user, 0) | self.catalog.mask_for(slugs)
+
+    def knows(self, username: str) -> bool:
+        """Has either process synced this user at least once?"""
+        return self.history.has_synced(username)
+
+    def solved_mask(self, username: str) -> int:
+        self._sync()
+        return self._bits.get(username.lower(), 0)
+
+    def fresh_pool(self, usernames, difficulty: str | None = None) -> int:
+        """Problems of `difficulty` that none of `usernames` has solved."""
+        self._sync()
+        solved = 0
+        for username in usernames:
+            solved |= self._bits.get(username.lower(), 0)
+        return self.catalog.pool_mask(difficulty) & ~solved
+
+    def pick_fresh(self, usernames, difficulty: str | None = None, rng: random.Random | None = None) -> dict | None:
+        """Uniformly sample a problem no user given is known to have solved."""
+        i = pick_set_bit(self.fresh_pool(usernames, difficulty), rng or random)
+        return self.catalog.problems[i] if i is not None else None
+
+    def pick_fresh_set(self, usernames, difficulty: str | None = None, count: int = 1, rng: random.Random | None = None) -> list[dict]:
+        """`count` distinct problems fresh for every user (fewer if the pool runs dry)."""
+        pool = self.fresh_pool(usernames, difficulty)
+        picked = []
+        for _ in range(count):
+            i = pick_set_bit(pool, rng or random)
+            if i is None:
+                break
+            pool &= ~(1 << i)
+            picked.append(self.catalog.problems[i])
+        return picked
+
+
+_index = None
+
+def get_solved_index() -> SolvedIndex:
+    global _index
+    if _index is None:
+        _index = SolvedIndex(get_catalog(), get_history())
+    return _index
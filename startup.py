@@ -0,0 +1,38 @@
+# startup.py
+
+import time
+from contextlib import contextmanager
+
+
+class BootTimer:
+    """
+    Collects wall-clock timings for each startup phase so both entry points
+    can log a single breakdown once the bot is ready.
+    """
+
+    def __init__(self, name: str, started_at: float | None = None):
+        self.name = name
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+        self.reported = False
+
+    @contextmanager
+    def phase(self, label: str):
+        """Time the enclosed block (works around `await` calls too)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((label, time.perf_counter() - start))
+
+    def record(self, label: str, seconds: float):
+        self.phases.append((label, seconds))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def report(self) -> str:
+        """One-line summary: total time-to-ready followed by each phase in ms."""
+        self.reported = True
+        parts = ", ".join(f"{label}={secs * 1000:.0f}ms" for label, secs in self.phases)
+        return f"[{self.name}] ready in {self.elapsed() * 1000:.0f}ms ({parts})"
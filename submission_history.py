@@ -0,0 +1,191 @@
+# submission_history.py
+
+import asyncio
+import sqlite3
+import threading
+import time
+import aiohttp
+from graphql_queries import QUERY_USER_SOLVED
+from leetcode_api import graphql, SUBMISSIONS_TTL
+from records import Submission
+
+HISTORY_DB = "history.db"
+SYNC_WINDOW = 20         # first page asked for on every poll
+MAX_SYNC_WINDOW = 200    # how far a single catch-up may widen the window
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    username      TEXT    NOT NULL,
+    submission_id TEXT    NOT NULL,
+    slug          TEXT    NOT NULL,
+    timestamp     INTEGER NOT NULL,
+    PRIMARY KEY (username, submission_id)
+);
+CREATE TABLE IF NOT EXISTS solves (
+    username TEXT    NOT NULL,
+    slug     TEXT    NOT NULL,
+    first_ac INTEGER NOT NULL,
+    last_ac  INTEGER NOT NULL,
+    PRIMARY KEY (username, slug)
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    username       TEXT PRIMARY KEY,
+    last_timestamp INTEGER NOT NULL,
+    synced_at      REAL    NOT NULL
+);
+"""
+
+
+class SubmissionHistory:
+    """
+    Local, append-only store of every accepted submission the bot has seen.
+
+    Each poll only ingests submissions newer than the user's cursor, rows are
+    deduplicated on (username, submission id), and `solves` keeps the first
+    and latest AC time per slug so solve checks are a single indexed lookup.
+    SQLite keeps it safe to share between bot.py and main.py.
+
+    Write transactions run in a worker thread so a busy database never
+    stalls the event loop; one lock serializes every use of the connection.
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def cursor_for(self, username: str) -> int:
+        with self._lock:
+            row = self.db.execute("SELECT last_timestamp FROM cursors WHERE username = ?", (username.lower(),)).fetchone()
+        return row[0] if row else -1
+
+    def has_synced(self, username: str) -> bool:
+        with self._lock:
+            row = self.db.execute("SELECT 1 FROM cursors WHERE username = ?", (username.lower(),)).fetchone()
+        return row is not None
+
+    async def ingest(self, username: str, subs: list[Submission]) -> list[Submission]:
+        """Insert submissions, skipping duplicates. Returns the ones that were new."""
+        return await asyncio.to_thread(self._ingest, username, subs)
+
+    def _ingest(self, username: str, subs: list[Submission]) -> list[Submission]:
+        user = username.lower()
+        new = []
+        with self._lock, self.db:
+            self.db.execute("BEGIN")
+            for sub in subs:
+                cur = self.db.execute(
+                    "INSERT OR IGNORE INTO submissions VALUES (?, ?, ?, ?)",
+                    (user, sub.submission_id, sub.slug, sub.timestamp),
+                )
+                if cur.rowcount:
+                    new.append(sub)
+                    self.db.execute(
+                        "INSERT INTO solves VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (username, slug) DO UPDATE SET "
+                        "first_ac = MIN(first_ac, excluded.first_ac), last_ac = MAX(last_ac, excluded.last_ac)",
+                        (user, sub.slug, sub.timestamp, sub.timestamp),
+                    )
+            latest = max((sub.timestamp for sub in subs), default=-1)
+            self.db.execute(
+                "INSERT INTO cursors VALUES (?, ?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET "
+                "last_timestamp = MAX(last_timestamp, excluded.last_timestamp), synced_at = excluded.synced_at",
+                (user, latest, time.time()),
+            )
+        return new
+
+    async def sync(self, session: aiohttp.ClientSession, username: str, limit: int = SYNC_WINDOW) -> list[Submission]:
+        """
+        Pull only what is newer than the stored cursor. If the whole window is
+        new, the user may have submitted more than a window's worth since the
+        last poll, so widen it until it overlaps the cursor (or hits the cap).
+        """
+        cursor = self.cursor_for(username)
+        while True:
+            variables = {"username": username, "limit": limit}
+            data = await graphql(session, QUERY_USER_SOLVED, variables, ttl=SUBMISSIONS_TTL)
+            subs = [Submission.from_payload(sub) for sub in (data.get("data") or {}).get("recentAcSubmissionList") or []]
+            # Same-second submissions are kept; ingest() dedupes them by id.
+            fresh = [sub for sub in subs if sub.timestamp >= cursor]
+            overlapped = any(sub.timestamp <= cursor for sub in subs) or len(subs) < limit
+            if overlapped or cursor < 0 or limit >= MAX_SYNC_WINDOW:
+                break
+            limit = min(limit * 2, MAX_SYNC_WINDOW)
+        return await self.ingest(username, fresh)
+
+    def solves_after(self, rowid: int) -> list[tuple[int, str, str]]:
+        """(rowid, username, slug) of every `solves` row added after `rowid`, oldest first."""
+        # Rowids only grow (writes are serialized), so this is an indexed range scan of what's new.
+        with self._lock:
+            return self.db.execute(
+                "SELECT rowid, username, slug FROM solves WHERE rowid > ? ORDER BY rowid", (rowid,)
+            ).fetchall()
+
+    def first_ac(self, username: str, slug: str) -> int | None:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT first_ac FROM solves WHERE username = ? AND slug = ?", (username.lower(), slug)
+            ).fetchone()
+        return row[0] if row else None
+
+    def last_ac(self, username: str) -> int | None:
+        """Time of the user's most recent accepted submission, if any is known."""
+        with self._lock:
+            row = self.db.execute("SELECT MAX(last_ac) FROM solves WHERE username = ?", (username.lower(),)).fetchone()
+        return row[0]
+
+    def solved_since(self, username: str, slug: str, since_timestamp: float) -> bool:
+        """Has the user had an AC on `slug` at or after `since_timestamp`?"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT last_ac FROM solves WHERE username = ? AND slug = ?", (username.lower(), slug)
+            ).fetchone()
+        return bool(row) and row[0] >= since_timestamp
+
+    def latest_acs(self, usernames, slugs) -> dict[tuple[str, str], int]:
+        """Latest AC time for every (user, slug) pair, a few hundred users per query."""
+        users = [u.lower() for u in usernames]
+        slugs = list(slugs)
+        result = {}
+        if not slugs:
+            return result
+        for i in range(0, len(users), 500):
+            chunk = users[i:i + 500]
+            with self._lock:
+                rows = self.db.execute(
+                    f"SELECT username, slug, last_ac FROM solves "
+                    f"WHERE slug IN ({','.join('?' * len(slugs))}) AND username IN ({','.join('?' * len(chunk))})",
+                    (*slugs, *chunk),
+                ).fetchall()
+            result.update(((user, slug), ts) for user, slug, ts in rows)
+        return result
+
+    def first_acs_since(self, usernames, slugs, since_timestamp: int) -> dict[tuple[str, str], int]:
+        """Earliest AC at or after `since_timestamp` for every (user, slug) pair."""
+        users = [u.lower() for u in usernames]
+        slugs = list(slugs)
+        result = {}
+        if not slugs:
+            return result
+        for i in range(0, len(users), 500):
+            chunk = users[i:i + 500]
+            with self._lock:
+                rows = self.db.execute(
+                    f"SELECT username, slug, MIN(timestamp) FROM submissions "
+                    f"WHERE timestamp >= ? AND slug IN ({','.join('?' * len(slugs))}) "
+                    f"AND username IN ({','.join('?' * len(chunk))}) GROUP BY username, slug",
+                    (since_timestamp, *slugs, *chunk),
+                ).fetchall()
+            result.update(((user, slug), ts) for user, slug, ts in rows)
+        return result
+
+
+_history = None
+
+def get_history() -> SubmissionHistory:
+    global _history
+    if _history is None:
+        _history = SubmissionHistory()
+    return _history
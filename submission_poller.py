@@ -0,0 +1,105 @@
+# submission_poller.py
+
+import asyncio
+import logging
+import aiohttp
+import clock
+from graphql_queries import batch_ac_query, QUERY_USER_SOLVED
+from leetcode_api import graphql, get_session, cached_result, cache_result, SUBMISSIONS_TTL
+from records import Submission
+from submission_history import SubmissionHistory, get_history, SYNC_WINDOW
+
+logger = logging.getLogger("leetcode_bot")
+
+POLL_INTERVAL = 5.0   # seconds between poll cycles
+BATCH_SIZE = 16       # users per aliased GraphQL request
+BATCH_LIMIT = SYNC_WINDOW   # recent ACs per user; matches sync() so cache entries are shared
+
+
+class SubmissionPoller:
+    """
+    One shared poller for everyone the bot is actively watching (duels,
+    tournaments). Each cycle fetches all watched users in batches of
+    BATCH_SIZE through one aliased query per batch, feeds the history
+    store, and stops by itself once nobody is being watched.
+    """
+
+    def __init__(self, history: SubmissionHistory, interval: float = POLL_INTERVAL, batch_size: int = BATCH_SIZE):
+        self.history = history
+        self.interval = interval
+        self.batch_size = batch_size
+        self.watchers: dict[str, set] = {}     # lowercased username → owners
+        self.names: dict[str, str] = {}        # lowercased → as linked
+        self.requests = 0
+        self.cycles = 0
+        self._wakeup = asyncio.Event()
+
+    def watch(self, supervisor, owner, usernames):
+        """Start polling `usernames` on behalf of `owner` (any hashable)."""
+        for name in usernames:
+            key = name.lower()
+            self.watchers.setdefault(key, set()).add(owner)
+            self.names[key] = name
+        # run() may have returned (nobody left to watch) before the supervisor's
+        # done-callback unregistered it; a finished task counts as not running.
+        info = supervisor.tasks.get("submission-poller")
+        if info is None or info.task.done():
+            supervisor.spawn("submission-poller", self.run, group="pollers", restart=True, replace=True)
+        self._wakeup.set()
+
+    def unwatch(self, owner):
+        for key in list(self.watchers):
+            self.watchers[key].discard(owner)
+            if not self.watchers[key]:
+                del self.watchers[key]
+                del self.names[key]
+
+    async def run(self):
+        session = get_session()
+        while self.watchers:
+            self._wakeup.clear()
+            await self.poll_once(session)
+            # A new watcher wakes the loop early so it gets its first poll now.
+            await clock.wait_event(self._wakeup, self.interval)
+
+    async def poll_once(self, session: aiohttp.ClientSession):
+        """
+        Users whose recent ACs are in the shared response cache (e.g. just
+        synced by the daily bot's status loop) are served from it; the rest
+        are fetched in batches, and each user's slice is cached under the
+        same key a single-user sync would use.
+        """
+        names = []
+        for key in self.watchers:
+            name = self.names[key]
+            cached = cached_result(QUERY_USER_SOLVED, {"username": name, "limit": BATCH_LIMIT})
+            if cached is None:
+                names.append(name)
+                continue
+            subs = (cached.get("data") or {}).get("recentAcSubmissionList") or []
+            await self.history.ingest(name, [Submission.from_payload(sub) for sub in subs])
+        self.cycles += 1
+        for i in range(0, len(names), self.batch_size):
+            batch = names[i:i + self.batch_size]
+            variables = {f"u{j}": name for j, name in enumerate(batch)}
+            variables["limit"] = BATCH_LIMIT
+            try:
+                self.requests += 1
+                data = (await graphql(session, batch_ac_query(len(batch)), variables)).get("data") or {}
+            except Exception as e:
+                logger.error("Batched submission poll failed for %d users: %s", len(batch), e,
+                             extra={"operation": "poll_submissions", "users": len(batch)})
+                continue
+            for j, name in enumerate(batch):
+                subs = data.get(f"u{j}") or []
+                cache_result(QUERY_USER_SOLVED, {"username": name, "limit": BATCH_LIMIT}, {"recentAcSubmissionList": subs}, SUBMISSIONS_TTL)
+                await self.history.ingest(name, [Submission.from_payload(sub) for sub in subs])
+
+
+_poller = None
+
+def get_poller() -> SubmissionPoller:
+    global _poller
+    if _poller is None:
+        _poller = SubmissionPoller(get_history())
+    return _poller
@@ -0,0 +1,135 @@
+# supervisor.py
+
+import asyncio
+import logging
+import time
+from discord.ext import commands
+from leetcode_api import close_session
+
+logger = logging.getLogger("leetcode_bot")
+
+RESTART_BACKOFF = 5.0  # seconds, doubled on every consecutive restart
+
+
+class TaskLimitReached(Exception):
+    """Raised when a group already runs as many tasks as it is allowed."""
+
+
+class TaskInfo:
+    __slots__ = ("name", "group", "factory", "task", "started_at", "restart", "max_restarts", "restarts", "on_exit")
+
+    def __init__(self, name, group, factory, restart, max_restarts, on_exit):
+        self.name = name
+        self.group = group
+        self.factory = factory
+        self.task: asyncio.Task | None = None
+        self.started_at = 0.0
+        self.restart = restart
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.on_exit = on_exit
+
+    @property
+    def runtime(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+class TaskSupervisor:
+    """
+    Owns every long-running background job: names it, enforces per-group
+    caps, logs (and optionally restarts) crashes, and cancels everything on
+    reload or shutdown so no orphaned poller keeps running.
+    """
+
+    def __init__(self, limits: dict[str, int] | None = None):
+        self.limits = limits or {}
+        self.tasks: dict[str, TaskInfo] = {}
+
+    def count(self, group: str) -> int:
+        return sum(1 for info in self.tasks.values() if info.group == group)
+
+    def has_capacity(self, group: str) -> bool:
+        limit = self.limits.get(group)
+        return limit is None or self.count(group) < limit
+
+    def spawn(self, name: str, factory, group: str = "default", *, restart: bool = False,
+              max_restarts: int = 3, replace: bool = False, on_exit=None) -> asyncio.Task:
+        """
+        Start `factory()` (a zero-arg coroutine function) as a named task.
+        `on_exit(info, exc)` runs when the task ends for good, crashed or not.
+        """
+        if name in self.tasks:
+            if not replace:
+                raise TaskLimitReached(f"task {name!r} is already running")
+            self.tasks.pop(name).task.cancel()
+        if not self.has_capacity(group):
+            raise TaskLimitReached(f"{group} is at its limit of {self.limits[group]} tasks")
+
+        info = TaskInfo(name, group, factory, restart, max_restarts, on_exit)
+        self.tasks[name] = info
+        self._start(info)
+        return info.task
+
+    def _start(self, info: TaskInfo):
+        info.started_at = time.monotonic()
+        info.task = asyncio.get_running_loop().create_task(info.factory(), name=info.name)
+        info.task.add_done_callback(lambda task, info=info: self._on_done(info, task))
+
+    def _on_done(self, info: TaskInfo, task: asyncio.Task):
+        if self.tasks.get(info.name) is not info:
+            return  # replaced or already forgotten
+        exc = None if task.cancelled() else task.exception()
+        if exc is not None:
+            logger.error("Background task %s crashed after %.0fs", info.name, info.runtime, exc_info=exc)
+            if info.restart and info.restarts < info.max_restarts:
+                info.restarts += 1
+                delay = RESTART_BACKOFF * 2 ** (info.restarts - 1)
+                logger.warning("Restarting %s in %.0fs (attempt %d/%d)", info.name, delay, info.restarts, info.max_restarts)
+                asyncio.get_running_loop().call_later(delay, self._restart, info)
+                return
+        del self.tasks[info.name]
+        if info.on_exit:
+            try:
+                info.on_exit(info, exc)
+            except Exception:
+                logger.exception("on_exit hook for %s failed", info.name)
+
+    def _restart(self, info: TaskInfo):
+        if self.tasks.get(info.name) is info:
+            self._start(info)
+
+    async def cancel(self, name: str):
+        info = self.tasks.get(name)
+        if info:
+            info.restart = False
+            if info.task.done():
+                # Crashed and waiting out its restart backoff.
+                self.tasks.pop(name, None)
+                return
+            info.task.cancel()
+            await asyncio.gather(info.task, return_exceptions=True)
+
+    async def cancel_group(self, group: str):
+        await asyncio.gather(*(self.cancel(name) for name, info in list(self.tasks.items()) if info.group == group))
+
+    async def shutdown(self):
+        await asyncio.gather(*(self.cancel(name) for name in list(self.tasks)))
+
+    def running(self, group: str | None = None) -> list[TaskInfo]:
+        return sorted(
+            (info for info in self.tasks.values() if group is None or info.group == group),
+            key=lambda info: (info.group, info.name),
+        )
+
+
+class SupervisedBot(commands.Bot):
+    """commands.Bot that owns a TaskSupervisor and drains it (and the shared HTTP session) on close()."""
+
+    def __init__(self, *args, task_limits: dict[str, int] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.supervisor = TaskSupervisor(task_limits)
+
+    async def close(self):
+        await self.supervisor.shutdown()
+        await close_session()
+        await super().close()
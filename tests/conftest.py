@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# The bot's modules are flat files at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,92 @@
+# tests/test_clock.py
+
+import asyncio
+import datetime as dt
+import time
+import pytest
+import clock
+
+IST = dt.timezone(dt.timedelta(hours=5, minutes=30))
+START = dt.datetime(2025, 1, 1, 0, 1, tzinfo=IST).timestamp()
+
+
+@pytest.fixture
+def virtual():
+    vc = clock.VirtualClock(START)
+    clock.install(vc)
+    yield vc
+    clock.install(clock.Clock())
+
+
+def test_next_run_later_today():
+    after = dt.datetime(2025, 1, 1, 0, 1, tzinfo=IST)
+    assert clock.next_run(dt.time(0, 35, tzinfo=IST), after) == dt.datetime(2025, 1, 1, 0, 35, tzinfo=IST)
+
+
+def test_next_run_is_strictly_after():
+    at = dt.time(0, 35, tzinfo=IST)
+    exactly = dt.datetime(2025, 1, 1, 0, 35, tzinfo=IST)
+    assert clock.next_run(at, exactly) == dt.datetime(2025, 1, 2, 0, 35, tzinfo=IST)
+    assert clock.next_run(at, exactly + dt.timedelta(hours=3)) == dt.datetime(2025, 1, 2, 0, 35, tzinfo=IST)
+
+
+def test_next_run_converts_timezones():
+    # 19:00 UTC on Jan 1 is already 00:30 IST on Jan 2.
+    after = dt.datetime(2025, 1, 1, 19, 0, tzinfo=dt.timezone.utc)
+    assert clock.next_run(dt.time(0, 35, tzinfo=IST), after) == dt.datetime(2025, 1, 2, 0, 35, tzinfo=IST)
+
+
+def test_sleepers_wake_in_time_order(virtual):
+    woke = []
+
+    async def sleeper(name, seconds):
+        await clock.sleep(seconds)
+        woke.append((name, clock.time() - START))
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(sleeper(name, s)) for name, s in [("c", 30), ("a", 10), ("b", 20), ("a2", 10)]]
+        await virtual.run_until(START + 25)
+        assert virtual.now == START + 25
+        await virtual.run_until(START + 60)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    # Equal wake-ups keep the order they went to sleep in.
+    assert woke == [("a", 10), ("a2", 10), ("b", 20), ("c", 30)]
+    assert virtual.jumps == 3
+
+
+def test_thread_work_settles_before_jump(virtual):
+    seen = []
+
+    async def worker():
+        await clock.sleep(10)
+        # Real-time work in a thread; the clock must not jump past it.
+        await virtual.to_thread(time.sleep, 0.05)
+        seen.append(clock.time() - START)
+        await clock.sleep(5)
+        seen.append(clock.time() - START)
+
+    async def scenario():
+        task = asyncio.ensure_future(worker())
+        await virtual.run_until(START + 100)
+        await task
+
+    asyncio.run(scenario())
+    assert seen == [10, 15]
+
+
+def test_daily_runs_once_per_day(virtual):
+    runs = []
+
+    async def job():
+        runs.append(clock.now(IST))
+
+    async def scenario():
+        task = asyncio.ensure_future(clock.daily(dt.time(0, 35, tzinfo=IST), job))
+        await virtual.run_until(START + 3 * 86400)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert [r.date() for r in runs] == [dt.date(2025, 1, d) for d in (1, 2, 3)]
+    assert all((r.hour, r.minute) == (0, 35) for r in runs)
@@ -0,0 +1,37 @@
+# tests/test_problem_sampler.py
+
+import random
+import pytest
+
+pytest.importorskip("aiohttp")   # problem_sampler pulls in the catalog's HTTP client
+from problem_sampler import AliasTable, ProblemSampler
+
+DRAWS = 200_000
+
+
+def test_alias_table_matches_weights():
+    weights = [1.0, 2.0, 3.0, 4.0, 0.0, 0.5]
+    table = AliasTable(weights)
+    rng = random.Random(42)
+    counts = [0] * len(weights)
+    for _ in range(DRAWS):
+        counts[table.sample(rng)] += 1
+    total = sum(weights)
+    for i, w in enumerate(weights):
+        assert abs(counts[i] / DRAWS - w / total) < 0.01, (i, counts[i])
+    assert counts[4] == 0   # a zero weight is never drawn
+
+
+def test_alias_table_single_and_uniform():
+    assert AliasTable([5.0]).sample(random.Random(0)) == 0
+    table = AliasTable([1.0] * 4)
+    assert table.prob == [1.0] * 4
+    assert len(AliasTable([])) == 0
+
+
+def test_set_weight_rejects_unknown_difficulty(tmp_path):
+    sampler = ProblemSampler(catalog=None, path=str(tmp_path / "sampler.json"))
+    with pytest.raises(ValueError):
+        sampler.set_weight(1, "difficulty", "extreme", 1.0)
+    sampler.set_weight(1, "difficulty", "medium", 0.5)
+    assert sampler.config_for(1)["difficulty"]["Medium"] == 0.5
@@ -0,0 +1,51 @@
+# tests/test_recommender.py
+
+import random
+import pytest
+
+pytest.importorskip("aiohttp")   # recommender pulls in the catalog's HTTP client
+np = pytest.importorskip("numpy")
+from recommender import Recommender
+
+TAGS = [("array", "Array"), ("dp", "Dynamic Programming"), ("graph", "Graph"), ("math", "Math"), ("tree", "Tree")]
+
+
+class FakeCatalog:
+    version = 1
+
+    def __init__(self, problems):
+        self.problems = problems
+
+
+def fake_catalog(n: int, rng: random.Random) -> FakeCatalog:
+    problems = []
+    for i in range(n):
+        tags = rng.sample(TAGS, rng.randint(0, 3))
+        problems.append({
+            "titleSlug": f"p{i}",
+            "difficulty": rng.choice(["Easy", "Medium", "Hard"]),
+            "isPaidOnly": rng.random() < 0.1,
+            "topicTags": [{"slug": slug, "name": name} for slug, name in tags],
+        })
+    return FakeCatalog(problems)
+
+
+def test_numpy_and_python_rank_agree():
+    rng = random.Random(7)
+    rec = Recommender(fake_catalog(60, rng), index=None)
+    rec._build()
+    masks = {f"u{i}": rng.getrandbits(60) & rng.getrandbits(60) for i in range(25)}
+    masks["nobody"] = 0
+    masks["everything"] = (1 << 60) - 1
+    profiles = {
+        "u0": {"counts_by_diff": {"Easy": 40, "Medium": 10, "Hard": 1},
+               "beats_by_diff": {"Easy": 80.0, "Medium": 55.5, "Hard": None},
+               "solved_by_tag": {"array": 30, "dp": 2, "tree": 9}},
+        "u1": {"beats_by_diff": {"Medium": 12.0}},   # beats only: counts come from local history
+    }
+
+    fast = rec._rank_numpy(masks, profiles, 10)
+    slow = {user: rec._rank_one(mask, profiles.get(user), 10) for user, mask in masks.items()}
+    assert fast == slow
+    assert fast["everything"]["picks"] == []
+    assert all(not rec._problems[i]["isPaidOnly"] for result in fast.values() for i, _ in result["picks"])
@@ -0,0 +1,75 @@
+# tests/test_results_archive.py
+
+import datetime as dt
+import os
+from results_archive import ResultsArchive
+
+DAY = dt.date(2024, 3, 1)
+
+
+def rows(*outcomes, user="1"):
+    """One row per problem; each outcome is whether it was solved."""
+    return [
+        {"slug": f"p{i}", "user": user, "solved": ok, "solved_at": 100 if ok else None, "explained": ok, "penalty": 0 if ok else 100}
+        for i, ok in enumerate(outcomes)
+    ]
+
+
+def test_append_round_trips(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    assert archive.append_day(DAY, rows(True, False) + rows(True, True, user="2"))
+    assert not archive.append_day(DAY, rows(True))   # same day again is skipped
+
+    reopened = ResultsArchive(str(tmp_path))
+    assert reopened.rows == 4
+    assert list(reopened.column("solved")) == [1, 0, 1, 1]
+    assert list(reopened.column("penalty")) == [0, 100, 0, 0]
+    summary = reopened.user_summary("1")
+    assert summary["problems"] == 2 and summary["solved"] == 1 and summary["penalty"] == 100
+    assert summary["first_day"] == DAY
+    assert reopened.user_summary("nobody") is None
+
+
+def test_torn_append_is_truncated(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    archive.append_day(DAY, rows(True, True))
+    # Simulate a crash after only some column files were extended.
+    with open(os.path.join(str(tmp_path), "slug.col"), "ab") as f:
+        f.write(b"\x00" * 8)
+    with open(os.path.join(str(tmp_path), "solved.col"), "ab") as f:
+        f.write(b"\x01")
+
+    reopened = ResultsArchive(str(tmp_path))
+    assert reopened.rows == 2
+    assert len(reopened.column("slug")) == 2
+    assert os.path.getsize(os.path.join(str(tmp_path), "solved.col")) == 2
+    assert reopened.append_day(DAY + dt.timedelta(days=1), rows(True))
+    assert ResultsArchive(str(tmp_path)).rows == 3
+
+
+def test_streaks(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    outcomes = [True, True, False, True, True, True]
+    for offset, ok in enumerate(outcomes):
+        archive.append_day(DAY + dt.timedelta(days=offset), rows(ok, True))
+    summary = archive.user_summary("1")
+    assert summary["best_streak"] == 3 and summary["current_streak"] == 3
+    assert summary["days"] == 6
+
+
+def test_gap_breaks_streak(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    for offset in (0, 1, 2):
+        archive.append_day(DAY + dt.timedelta(days=offset), rows(True))
+    # Member missing on day 3 (e.g. lost the role), back on day 4.
+    archive.append_day(DAY + dt.timedelta(days=3), rows(True, user="2"))
+    archive.append_day(DAY + dt.timedelta(days=4), rows(True))
+    summary = archive.user_summary("1")
+    assert summary["best_streak"] == 3 and summary["current_streak"] == 1
+
+
+def test_current_streak_needs_latest_day(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    archive.append_day(DAY, rows(True))
+    archive.append_day(DAY + dt.timedelta(days=1), rows(True, user="2"))
+    assert archive.user_summary("1")["current_streak"] == 0